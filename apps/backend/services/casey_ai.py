@@ -1,29 +1,454 @@
 """
+Advanced Casey AI - process intelligence, learning and adaptive conversation
+"""
 import re
 import json
 import time
 import math
-import random
-from typing import Dict, List, Tuple, Optional, Any
-from collections import defaultdict, Counter
-from dataclasses import dataclass, field
+import itertools
+from typing import Callable, Dict, FrozenSet, List, Mapping, Sequence, Tuple, Optional, Any
+from collections import defaultdict, deque, Counter, OrderedDict
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from types import MappingProxyType
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def _compile_patterns(*patterns: str) -> Tuple[re.Pattern, ...]:
+    """Compile case-insensitive patterns with Unicode-aware word boundaries"""
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+
+# Entity and process-element patterns, compiled once at import ----------------
+ACTOR_PATTERNS = _compile_patterns(
+    r'\b(manager|director|analyst|coordinator|specialist|representative|admin|user|customer|client|vendor|team|staff|engineer|developer|designer|marketer|salesperson|accountant|hr|legal)\b',
+    r'\b([A-Z][a-z]+ team)\b',
+    r'\b(C[A-Z]{2})\b'  # CEO, CTO, etc.
+)
+
+TOOL_PATTERNS = _compile_patterns(
+    r'\b(Salesforce|SAP|Oracle|Microsoft|Google|Slack|Jira|Confluence|Excel|PowerBI|Tableau|Zoom|Teams|Asana|Trello|GitHub|Jenkins|AWS|Azure|Docker)\b',
+    r'\b(\w+(?:\.com|\.org|\.net))\b',
+    r'\b(\w+ system|\w+ platform|\w+ tool|\w+ software)\b'
+)
+
+METRIC_PATTERNS = _compile_patterns(
+    r'\b(\d+(?:\.\d+)?%)\b',
+    r'\b(\d+(?:\.\d+)?\s*(?:hours?|days?|weeks?|months?))\b',
+    r'\b(cycle time|lead time|throughput|accuracy|efficiency|cost|revenue|profit|ROI|SLA)\b'
+)
+
+TIMEFRAME_PATTERNS = _compile_patterns(
+    r'\b(daily|weekly|monthly|quarterly|annually|real-time|immediate|urgent)\b',
+    r'\b(within \d+ (?:hours?|days?|weeks?))\b',
+    r'\b(by \w+day|by end of \w+)\b'
+)
+
+STEP_PATTERNS = _compile_patterns(
+    r'(?:first|then|next|after|finally|lastly),?\s*([^.!?]+)',
+    r'(\d+[\.\)]\s*[^.!?]+)',
+    r'((?:create|submit|review|approve|send|process|handle|analyze|generate|update|delete|validate|check|verify|confirm|notify)\s*[^.!?]*)',
+)
+
+DECISION_PATTERNS = _compile_patterns(
+    r'(if\s+[^,]+,\s*[^.!?]+)',
+    r'((?:approve|reject|accept|deny|choose|decide)\s*[^.!?]*)',
+    r'(either\s+[^.!?]+)',
+    r'(depends on\s+[^.!?]+)'
+)
+
+HANDOFF_PATTERNS = _compile_patterns(
+    r'((?:send to|forward to|assign to|escalate to|hand over to)\s*[^.!?]*)',
+    r'(then\s+\w+\s+(?:takes over|handles|processes)\s*[^.!?]*)'
+)
+
+
+# Keyword tables for the text analyzers ---------------------------------------
+INTENT_TRIGGERS = (
+    ("describe_process", frozenset({"how does", "process", "workflow", "steps"}), 0.8),
+    ("solve_problem", frozenset({"problem", "issue", "broken", "not working", "stuck"}), 0.9),
+    ("optimize_process", frozenset({"optimize", "improve", "better", "faster", "efficient"}), 0.7),
+    ("understand_process", frozenset({"why", "what", "explain", "understand"}), 0.6),
+    ("compare_options", frozenset({"vs", "versus", "compare", "better than", "alternative"}), 0.8),
+    ("express_frustration", frozenset({"frustrated", "annoying", "waste", "terrible", "hate"}), 0.9),
+    ("seek_validation", frozenset({"right", "correct", "good", "makes sense", "validate"}), 0.7),
+    ("request_analysis", frozenset({"analyze", "metrics", "performance", "report", "insights"}), 0.8),
+)
+
+EMOTION_INDICATORS = {
+    "frustrated": frozenset({
+        "stuck", "blocked", "can't", "impossible", "terrible", "awful",
+        "waste", "ridiculous", "stupid", "broken", "useless"
+    }),
+    "excited": frozenset({
+        "great", "awesome", "excellent", "perfect", "love", "amazing",
+        "fantastic", "brilliant", "excited", "thrilled"
+    }),
+    "confused": frozenset({
+        "confused", "unclear", "don't understand", "lost", "complex",
+        "complicated", "messy", "chaotic", "overwhelming"
+    }),
+    "confident": frozenset({
+        "sure", "certain", "definitely", "absolutely", "confident",
+        "clear", "straightforward", "simple", "easy"
+    }),
+}
+
+DOMAIN_INDICATORS = {
+    "finance": ("invoice", "payment", "budget", "accounting", "audit", "expense", "revenue", "cost"),
+    "hr": ("hiring", "employee", "onboarding", "performance", "benefits", "payroll", "recruitment"),
+    "engineering": ("development", "code", "deploy", "testing", "bug", "feature", "system", "technical"),
+    "sales": ("lead", "prospect", "deal", "pipeline", "commission", "quota", "crm", "customer"),
+    "marketing": ("campaign", "content", "brand", "social", "advertising", "analytics", "conversion"),
+    "operations": ("supply chain", "logistics", "inventory", "procurement", "vendor", "quality"),
+    "legal": ("contract", "compliance", "regulatory", "agreement", "terms", "policy", "risk"),
+    "customer_service": ("support", "ticket", "resolution", "customer", "service", "escalation"),
+}
+
+# Reverse index so domain scoring only visits keywords that actually matched
+DOMAINS_BY_KEYWORD: Dict[str, Tuple[str, ...]] = {}
+for _domain, _indicators in DOMAIN_INDICATORS.items():
+    for _indicator in _indicators:
+        DOMAINS_BY_KEYWORD[_indicator] = DOMAINS_BY_KEYWORD.get(_indicator, ()) + (_domain,)
+del _domain, _indicators, _indicator
+
+EXPERT_INDICATORS = frozenset({
+    "kpi", "sla", "roi", "throughput", "latency", "optimization", "automation",
+    "compliance", "governance", "methodology", "framework", "best practice"
+})
+
+BEGINNER_INDICATORS = frozenset({
+    "how do", "what is", "can you explain", "i'm new", "don't understand",
+    "simple", "basic", "help me", "confused", "not sure"
+})
+
+PAIN_POINT_PATTERNS = {
+    "delay": frozenset({"slow", "takes too long", "delayed", "waiting", "bottleneck"}),
+    "manual_work": frozenset({"manual", "by hand", "tedious", "repetitive", "time-consuming"}),
+    "errors": frozenset({"mistake", "error", "wrong", "incorrect", "inaccurate"}),
+    "confusion": frozenset({"unclear", "confusing", "don't know", "uncertain", "ambiguous"}),
+    "complexity": frozenset({"complex", "complicated", "difficult", "hard", "overwhelming"}),
+    "communication": frozenset({"miscommunication", "not informed", "don't know", "unclear"}),
+}
+
+REQUIREMENT_TRIGGERS = (
+    ("speed_optimization", frozenset({"fast", "quick", "urgent", "asap"})),
+    ("quality_improvement", frozenset({"accurate", "correct", "precise", "error"})),
+    ("visibility_metrics", frozenset({"track", "monitor", "measure", "report"})),
+    ("automation_opportunity", frozenset({"automate", "automatic", "manual", "tedious"})),
+    ("approval_workflow", frozenset({"approve", "approval", "sign off", "authorize"})),
+    ("compliance_tracking", frozenset({"compliant", "audit", "regulation", "policy"})),
+)
+
+# Keyword tables for the process classifier and optimization engine. These
+# are matched as substrings of the joined step text, so "sign" also matches
+# "design" and "review" matches "reviewed", as they always have.
+PROCESS_TYPE_KEYWORDS = (
+    ("approval", frozenset({"approve", "review", "authorize", "sign"})),
+    ("creative", frozenset({"create", "design", "develop", "build"})),
+    ("analytical", frozenset({"analyze", "calculate", "report", "measure"})),
+)
+
+AUTOMATION_INDICATORS = frozenset({"manual", "copy", "enter", "type", "fill", "check"})
+
+SEQUENCING_WORDS = frozenset({"then", "after", "depends"})
+
+STEP_KEYWORD_VOCABULARY = frozenset(
+    [word for _, keywords in PROCESS_TYPE_KEYWORDS for word in keywords]
+    + list(AUTOMATION_INDICATORS)
+    + list(SEQUENCING_WORDS)
+)
+
+# Every keyword above, deduplicated, so a turn scans each one only once
+KEYWORD_VOCABULARY = frozenset(
+    [word for _, triggers, _ in INTENT_TRIGGERS for word in triggers]
+    + [word for indicators in EMOTION_INDICATORS.values() for word in indicators]
+    + [word for indicators in DOMAIN_INDICATORS.values() for word in indicators]
+    + list(EXPERT_INDICATORS)
+    + list(BEGINNER_INDICATORS)
+    + [word for indicators in PAIN_POINT_PATTERNS.values() for word in indicators]
+    + [word for _, triggers in REQUIREMENT_TRIGGERS for word in triggers]
+)
+
+
+def _build_keyword_automaton(vocabulary: FrozenSet[str]):
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in vocabulary:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = _build_keyword_automaton(KEYWORD_VOCABULARY)
+STEP_KEYWORD_AUTOMATON = _build_keyword_automaton(STEP_KEYWORD_VOCABULARY)
+
+
+def _scan(automaton, vocabulary: FrozenSet[str], text_lower: str) -> FrozenSet[str]:
+    if automaton is not None:
+        return frozenset(keyword for _, keyword in automaton.iter(text_lower))
+    return frozenset(keyword for keyword in vocabulary if keyword in text_lower)
+
+
+# Several stages of one turn scan the same message. Only a few short texts
+# are cached, so the caches never hold much user input
+SCAN_CACHE_MAX_ENTRIES = 32
+SCAN_CACHE_MAX_CHARS = 1024
+
+
+@lru_cache(maxsize=SCAN_CACHE_MAX_ENTRIES)
+def _scan_keywords_cached(text_lower: str) -> FrozenSet[str]:
+    return _scan(KEYWORD_AUTOMATON, KEYWORD_VOCABULARY, text_lower)
+
+
+@lru_cache(maxsize=SCAN_CACHE_MAX_ENTRIES)
+def _scan_step_keywords_cached(step_text: str) -> FrozenSet[str]:
+    return _scan(STEP_KEYWORD_AUTOMATON, STEP_KEYWORD_VOCABULARY, step_text)
+
+
+def scan_keywords(text_lower: str) -> FrozenSet[str]:
+    """Return every vocabulary keyword occurring in ``text_lower`` as a substring.
+
+    Uses a single Aho-Corasick pass when ``pyahocorasick`` is installed and
+    falls back to one ``in`` check per distinct keyword otherwise.
+    """
+    if len(text_lower) > SCAN_CACHE_MAX_CHARS:
+        return _scan(KEYWORD_AUTOMATON, KEYWORD_VOCABULARY, text_lower)
+    return _scan_keywords_cached(text_lower)
+
+
+def scan_step_keywords(step_text: str) -> FrozenSet[str]:
+    """Like :func:`scan_keywords`, for the classifier and optimization keywords"""
+    if len(step_text) > SCAN_CACHE_MAX_CHARS:
+        return _scan(STEP_KEYWORD_AUTOMATON, STEP_KEYWORD_VOCABULARY, step_text)
+    return _scan_step_keywords_cached(step_text)
+
+
+def scan_steps(steps: Sequence[str]) -> FrozenSet[str]:
+    """Join and lowercase ``steps`` once and scan them for step keywords.
+
+    Callers running both the classifier and the optimization engine over the
+    same steps can scan once and pass the result to each as ``step_hits``.
+    """
+    return scan_step_keywords(" ".join(steps).lower())
+
+
+def _find_all(patterns: Tuple[Any, ...], text: str) -> Tuple[str, ...]:
+    """All matches of ``patterns`` in ``text``, in pattern order"""
+    return tuple(match for pattern in patterns for match in pattern.findall(text))
+
+
+# Canned responses, asked in rotation rather than picked at random
+EMPATHETIC_OPENERS = (
+    "I can hear the frustration in what you're describing. Let's break this down into manageable pieces and find some quick wins.",
+    "That does sound challenging. Let me help you identify the biggest pain point we can address first.",
+    "I understand this process is causing headaches. Let's work together to smooth out these rough edges."
+)
+
+DISCOVERY_QUESTIONS = (
+    "What happens when things go wrong in this process? Understanding failure modes helps identify improvement opportunities.",
+    "How do you currently measure success for this process? Any KPIs or metrics you track?",
+    "What's the most frustrating part of this process for the people involved?",
+    "Are there seasonal variations or peak times when this process gets stressed?",
+    "What would 'perfect' look like for this process if you could wave a magic wand?"
+)
 
-@dataclass
+# Suggested fix for each pain point in problem-solving replies
+PAIN_POINT_SOLUTIONS = MappingProxyType({
+    "delay": "implement parallel processing and eliminate wait states",
+    "manual_work": "automate repetitive tasks and create templates",
+    "errors": "add validation checkpoints and error prevention",
+    "confusion": "create clear documentation and process maps",
+    "complexity": "simplify workflows and reduce decision points"
+})
+
+
+@dataclass(frozen=True, slots=True)
 class ProcessInsight:
     """Represents an AI-generated insight about a process"""
+    type: str  # optimization, risk, performance, compliance
     confidence: float
     title: str
     description: str
     impact: str  # low, medium, high, critical
-    actionable_steps: List[str]
-    metrics: Dict[str, Any] = field(default_factory=dict)
-
-@dataclass
+    actionable_steps: Sequence[str]
+    metrics: Mapping[str, Any] = field(default_factory=dict)
+
+
+# Prebuilt insights, shared across turns ---------------------------------------
+AUTOMATION_INSIGHT = ProcessInsight(
+    type="optimization",
+    confidence=0.85,
+    title="Automation Opportunity Detected",
+    description="This process contains manual steps that could be automated to improve efficiency and reduce errors.",
+    impact="high",
+    actionable_steps=(
+        "Identify repetitive manual tasks",
+        "Evaluate automation tools (RPA, workflow engines)",
+        "Create pilot automation for highest-impact step",
+        "Measure ROI and expand successful automations"
+    ),
+    metrics=MappingProxyType({"potential_time_savings": "30-60%", "error_reduction": "80-95%"})
+)
+
+BOTTLENECK_INSIGHT = ProcessInsight(
+    type="risk",
+    confidence=0.9,
+    title="Bottleneck Risk Identified",
+    description="Process delays detected. This could impact SLAs and customer satisfaction.",
+    impact="medium",
+    actionable_steps=(
+        "Map current wait times at each step",
+        "Identify root cause of delays",
+        "Implement parallel processing where possible",
+        "Set up monitoring alerts for SLA breaches"
+    ),
+    metrics=MappingProxyType({"current_bottleneck_impact": "high", "sla_risk": "medium"})
+)
+
+QUALITY_INSIGHT = ProcessInsight(
+    type="performance",
+    confidence=0.8,
+    title="Quality Improvement Opportunity",
+    description="Error patterns suggest need for quality gates and validation checkpoints.",
+    impact="high",
+    actionable_steps=(
+        "Implement validation checkpoints",
+        "Create error prevention checklists",
+        "Add automated quality gates",
+        "Train team on error prevention"
+    ),
+    metrics=MappingProxyType({"error_reduction_potential": "70-90%", "rework_savings": "significant"})
+)
+
+# (analysis key, trigger, insight) checked in order for every turn
+INSIGHT_RULES = (
+    ("implicit_requirements", "automation_opportunity", AUTOMATION_INSIGHT),
+    ("pain_points", "delay", BOTTLENECK_INSIGHT),
+    ("pain_points", "errors", QUALITY_INSIGHT),
+)
+
+# Compliance insights only apply in regulated domains
+COMPLIANCE_INSIGHTS = MappingProxyType({
+    domain: ProcessInsight(
+        type="compliance",
+        confidence=0.95,
+        title="Compliance Tracking Required",
+        description=f"Processes in {domain} domain typically require audit trails and compliance monitoring.",
+        impact="critical",
+        actionable_steps=(
+            "Implement audit logging",
+            "Create compliance checkpoints",
+            "Document approval chains",
+            "Set up regular compliance reviews"
+        ),
+        metrics=MappingProxyType({"compliance_coverage": "99%+", "audit_readiness": "high"})
+    )
+    for domain in ("finance", "hr", "legal")
+})
+
+
+@dataclass(slots=True)
+class ConversationContext:
+    """Tracks what Casey has learned about a user across a conversation"""
+    user_expertise: str = "intermediate"
+    domain: str = "general"
     emotional_state: str = "neutral"
     conversation_pattern: str = "exploratory"
     goals: List[str] = field(default_factory=list)
     pain_points: List[str] = field(default_factory=list)
     preferences: Dict[str, Any] = field(default_factory=dict)
+    discovery_index: int = 0  # next default discovery question to ask
+
+
+# Domains the risk engine flags for compliance documentation
+REGULATED_DOMAINS = frozenset({"finance", "hr", "legal", "healthcare"})
+
+# Prebuilt insights for the optimization and risk engines
+STEP_AUTOMATION_INSIGHT = ProcessInsight(
+    type="optimization",
+    confidence=0.8,
+    title="Automation Opportunity",
+    description="Process contains manual steps suitable for automation",
+    impact="high",
+    actionable_steps=("Identify automation tools", "Create pilot", "Measure ROI"),
+    metrics=MappingProxyType({"time_savings": "40-60%"})
+)
+
+PARALLELIZATION_INSIGHT = ProcessInsight(
+    type="optimization",
+    confidence=0.7,
+    title="Parallel Processing Opportunity",
+    description="Steps could be executed in parallel to reduce cycle time",
+    impact="medium",
+    actionable_steps=("Map dependencies", "Identify parallel paths", "Redesign workflow"),
+    metrics=MappingProxyType({"cycle_time_reduction": "20-40%"})
+)
+
+SINGLE_POINT_OF_FAILURE_INSIGHT = ProcessInsight(
+    type="risk",
+    confidence=0.9,
+    title="Single Point of Failure Risk",
+    description="Process depends on single person/system creating vulnerability",
+    impact="high",
+    actionable_steps=("Cross-train team members", "Create backup procedures", "Document process"),
+    metrics=MappingProxyType({"business_continuity_risk": "high"})
+)
+
+
+@lru_cache(maxsize=16)
+def _compliance_documentation_insight(domain: str) -> ProcessInsight:
+    return ProcessInsight(
+        type="compliance",
+        confidence=0.85,
+        title="Compliance Documentation Required",
+        description=f"Processes in {domain} require audit trails and controls",
+        impact="critical",
+        actionable_steps=("Implement audit logging", "Document approvals", "Regular reviews"),
+        metrics=MappingProxyType({"compliance_coverage": "required"})
+    )
+
+
+# Upper bound on conversations whose context is kept in memory
+MAX_CONVERSATION_PROFILES = 1000
+
+# Most recent turns kept per conversation for learning
+MAX_LEARNING_ENTRIES = 100
+
+
+class ConversationProfiles(OrderedDict):
+    """Per-conversation contexts, created on first access and evicted least recently used first"""
+
+    def __init__(self, max_conversations: int = MAX_CONVERSATION_PROFILES,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        super().__init__()
+        self.max_conversations = max_conversations
+        # Called with the evicted conversation id so per-conversation state
+        # kept elsewhere is dropped along with the context
+        self.on_evict = on_evict
+
+    def __getitem__(self, conversation_id: str) -> ConversationContext:
+        context = super().__getitem__(conversation_id)
+        self.move_to_end(conversation_id)
+        return context
+
+    def __missing__(self, conversation_id: str) -> ConversationContext:
+        context = self[conversation_id] = ConversationContext()
+        return context
+
+    def __setitem__(self, conversation_id: str, context: ConversationContext):
+        super().__setitem__(conversation_id, context)
+        self.move_to_end(conversation_id)
+        if len(self) > self.max_conversations:
+            evicted_id, _ = self.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted_id)
 
 
 class AdvancedCaseyAI:
@@ -35,8 +460,18 @@ class AdvancedCaseyAI:
         self.knowledge_base = self._initialize_knowledge_base()
         self.conversation_memory = {}
         self.process_patterns = {}
-        self.learning_data = defaultdict(list)
-        self.user_profiles = defaultdict(ConversationContext)
+        self.learning_data = defaultdict(lambda: deque(maxlen=MAX_LEARNING_ENTRIES))
+        self.user_profiles = ConversationProfiles(on_evict=self._forget_conversation)
+
+        # Rotate empathetic openers per instance rather than drawing from the
+        # shared global random generator
+        self._empathetic_openers = itertools.cycle(EMPATHETIC_OPENERS)
+
+        # Response generators for intents that get a dedicated reply
+        self._intent_responders = {
+            "optimize_process": self._generate_optimization_response,
+            "solve_problem": self._generate_problem_solving_response,
+        }
 
         # AI Models (simplified but sophisticated)
         self.process_classifier = ProcessClassifier()
@@ -98,28 +533,31 @@ class AdvancedCaseyAI:
             "optimization_patterns": [
                 "parallel processing", "automation", "elimination", "standardization",
                 "batching", "delegation", "exception handling", "continuous improvement"
-
+            ]
         }
 
     def analyze_conversation_turn(self, user_input: str, conversation_id: str = "default") -> Dict[str, Any]:
         """Comprehensive analysis of a conversation turn"""
 
-        # Update conversation context
-        context = self.user_profiles[conversation_id]
-        self._update_context(user_input, context)
+        # Lowercase and scan once for every keyword the analyzers below look for
+        keyword_hits = scan_keywords(user_input.lower())
 
         # Multi-layered analysis
         analysis = {
-            "intent": self._analyze_intent(user_input),
+            "intent": self._analyze_intent(user_input, keyword_hits),
             "entities": self._extract_entities(user_input),
-            "emotional_state": self._analyze_emotion(user_input),
+            "emotional_state": self._analyze_emotion(user_input, keyword_hits),
             "process_elements": self._extract_process_elements(user_input),
-            "domain": self._classify_domain(user_input),
-            "expertise_indicators": self._assess_expertise(user_input),
-            "pain_points": self._identify_pain_points(user_input),
-            "implicit_requirements": self._infer_requirements(user_input)
+            "domain": self._classify_domain(user_input, keyword_hits),
+            "expertise_indicators": self._assess_expertise(user_input, keyword_hits),
+            "pain_points": self._identify_pain_points(user_input, keyword_hits),
+            "implicit_requirements": self._infer_requirements(user_input, keyword_hits)
         }
 
+        # Update conversation context from the analysis above
+        context = self.user_profiles[conversation_id]
+        self._update_context(user_input, context, analysis)
+
         # Generate insights
         insights = self._generate_insights(analysis, context)
 
@@ -133,106 +571,40 @@ class AdvancedCaseyAI:
 
         }
 
-    def _analyze_intent(self, text: str) -> Dict[str, float]:
+    def _analyze_intent(self, text: str, keyword_hits: Optional[FrozenSet[str]] = None) -> Dict[str, float]:
         """Advanced intent classification"""
-        intents = {
-            "describe_process": 0.0,
-            "solve_problem": 0.0,
-            "optimize_process": 0.0,
-            "understand_process": 0.0,
-            "compare_options": 0.0,
-            "express_frustration": 0.0,
-            "seek_validation": 0.0,
-            "request_analysis": 0.0
-        }
-
-        text_lower = text.lower()
+        hits = self._keyword_hits(text, keyword_hits)
+        intents = {intent: 0.0 for intent, _, _ in INTENT_TRIGGERS}
 
         # Pattern matching with confidence scoring
-        if any(word in text_lower for word in ["how does", "process", "workflow", "steps"]):
-            intents["describe_process"] = 0.8
-
-        if any(word in text_lower for word in ["problem", "issue", "broken", "not working", "stuck"]):
-            intents["solve_problem"] = 0.9
-
-        if any(word in text_lower for word in ["optimize", "improve", "better", "faster", "efficient"]):
-            intents["optimize_process"] = 0.7
-
-        if any(word in text_lower for word in ["why", "what", "explain", "understand"]):
-            intents["understand_process"] = 0.6
-
-        if any(word in text_lower for word in ["vs", "versus", "compare", "better than", "alternative"]):
-            intents["compare_options"] = 0.8
-
-        if any(word in text_lower for word in ["frustrated", "annoying", "waste", "terrible", "hate"]):
-            intents["express_frustration"] = 0.9
-
-        if any(word in text_lower for word in ["right", "correct", "good", "makes sense", "validate"]):
-            intents["seek_validation"] = 0.7
-
-        if any(word in text_lower for word in ["analyze", "metrics", "performance", "report", "insights"]):
-            intents["request_analysis"] = 0.8
+        for intent, triggers, confidence in INTENT_TRIGGERS:
+            if not hits.isdisjoint(triggers):
+                intents[intent] = confidence
 
         return intents
 
     def _extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Advanced entity extraction"""
         entities = {
-            "actors": [],
-            "tools": [],
-            "processes": [],
-            "metrics": [],
-            "timeframes": [],
-            "departments": [],
-            "technologies": [],
-            "documents": []
+            "actors": set(),
+            "tools": set(),
+            "processes": set(),
+            "metrics": set(),
+            "timeframes": set(),
+            "departments": set(),
+            "technologies": set(),
+            "documents": set()
         }
 
-        # Enhanced pattern matching
-        actor_patterns = [
-            r'\b(manager|director|analyst|coordinator|specialist|representative|admin|user|customer|client|vendor|team|staff|engineer|developer|designer|marketer|salesperson|accountant|hr|legal)\b',
-            r'\b([A-Z][a-z]+ team)\b',
-            r'\b(C[A-Z]{2})\b'  # CEO, CTO, etc.
-        ]
-
-        tool_patterns = [
-            r'\b(Salesforce|SAP|Oracle|Microsoft|Google|Slack|Jira|Confluence|Excel|PowerBI|Tableau|Zoom|Teams|Asana|Trello|GitHub|Jenkins|AWS|Azure|Docker)\b',
-            r'\b(\w+(?:\.com|\.org|\.net))\b',
-            r'\b(\w+ system|\w+ platform|\w+ tool|\w+ software)\b'
-        ]
+        # Extract entities, lowercasing and deduplicating as we go
+        entities["actors"].update(item.lower() for item in _find_all(ACTOR_PATTERNS, text) if item)
+        entities["tools"].update(item.lower() for item in _find_all(TOOL_PATTERNS, text) if item)
+        entities["metrics"].update(item.lower() for item in _find_all(METRIC_PATTERNS, text) if item)
+        entities["timeframes"].update(item.lower() for item in _find_all(TIMEFRAME_PATTERNS, text) if item)
 
-        metric_patterns = [
-            r'\b(\d+(?:\.\d+)?%)\b',
-            r'\b(\d+(?:\.\d+)?\s*(?:hours?|days?|weeks?|months?))\b',
-            r'\b(cycle time|lead time|throughput|accuracy|efficiency|cost|revenue|profit|ROI|SLA)\b'
-        ]
-
-        timeframe_patterns = [
-            r'\b(daily|weekly|monthly|quarterly|annually|real-time|immediate|urgent)\b',
-            r'\b(within \d+ (?:hours?|days?|weeks?))\b',
-            r'\b(by \w+day|by end of \w+)\b'
-        ]
+        return {key: list(items) for key, items in entities.items()}
 
-        # Extract entities
-        for pattern in actor_patterns:
-            entities["actors"].extend(re.findall(pattern, text, re.IGNORECASE))
-
-        for pattern in tool_patterns:
-            entities["tools"].extend(re.findall(pattern, text, re.IGNORECASE))
-
-        for pattern in metric_patterns:
-            entities["metrics"].extend(re.findall(pattern, text, re.IGNORECASE))
-
-        for pattern in timeframe_patterns:
-            entities["timeframes"].extend(re.findall(pattern, text, re.IGNORECASE))
-
-        # Clean and deduplicate
-        for key in entities:
-            entities[key] = list(set([item.lower() for item in entities[key] if item]))
-
-        return entities
-
-    def _analyze_emotion(self, text: str) -> Dict[str, float]:
+    def _analyze_emotion(self, text: str, keyword_hits: Optional[FrozenSet[str]] = None) -> Dict[str, float]:
         """Advanced emotional analysis"""
         emotions = {
             "frustrated": 0.0,
@@ -245,49 +617,11 @@ class AdvancedCaseyAI:
             "impatient": 0.0
         }
 
-        # Sophisticated emotional indicators
-        frustration_indicators = [
-            "stuck", "blocked", "can't", "impossible", "terrible", "awful",
-            "waste", "ridiculous", "stupid", "broken", "useless"
-        ]
-
-        excitement_indicators = [
-            "great", "awesome", "excellent", "perfect", "love", "amazing",
-            "fantastic", "brilliant", "excited", "thrilled"
-        ]
-
-        confusion_indicators = [
-            "confused", "unclear", "don't understand", "lost", "complex",
-            "complicated", "messy", "chaotic", "overwhelming"
-        ]
-
-        confidence_indicators = [
-            "sure", "certain", "definitely", "absolutely", "confident",
-            "clear", "straightforward", "simple", "easy"
-        ]
-
-        text_lower = text.lower()
-
-        # Score emotions based on indicators
-        for indicator in frustration_indicators:
-            if indicator in text_lower:
-                emotions["frustrated"] += 0.3
-
-        for indicator in excitement_indicators:
-            if indicator in text_lower:
-                emotions["excited"] += 0.3
+        hits = self._keyword_hits(text, keyword_hits)
 
-        for indicator in confusion_indicators:
-            if indicator in text_lower:
-                emotions["confused"] += 0.3
-
-        for indicator in confidence_indicators:
-            if indicator in text_lower:
-                emotions["confident"] += 0.3
-
-        # Cap emotions at 1.0
-        for emotion in emotions:
-            emotions[emotion] = min(emotions[emotion], 1.0)
+        # Score emotions at 0.3 per matched indicator, capped at 1.0
+        for emotion, indicators in EMOTION_INDICATORS.items():
+            emotions[emotion] = min(len(hits.intersection(indicators)) * 0.3, 1.0)
 
         return emotions
 
@@ -303,83 +637,32 @@ class AdvancedCaseyAI:
             "dependencies": []
         }
 
-        # Advanced step detection
-        step_patterns = [
-            r'(?:first|then|next|after|finally|lastly),?\s*([^.!?]+)',
-            r'(\d+[\.\)]\s*[^.!?]+)',
-            r'((?:create|submit|review|approve|send|process|handle|analyze|generate|update|delete|validate|check|verify|confirm|notify)\s*[^.!?]*)',
-        ]
-
-        # Decision point detection
-        decision_patterns = [
-            r'(if\s+[^,]+,\s*[^.!?]+)',
-            r'((?:approve|reject|accept|deny|choose|decide)\s*[^.!?]*)',
-            r'(either\s+[^.!?]+)',
-            r'(depends on\s+[^.!?]+)'
-        ]
-
-        # Handoff detection
-        handoff_patterns = [
-            r'((?:send to|forward to|assign to|escalate to|hand over to)\s*[^.!?]*)',
-            r'(then\s+\w+\s+(?:takes over|handles|processes)\s*[^.!?]*)'
-        ]
-
         # Extract elements
-        for pattern in step_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            elements["steps"].extend([match.strip() for match in matches])
-
-        for pattern in decision_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            elements["decisions"].extend([match.strip() for match in matches])
-
-        for pattern in handoff_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            elements["handoffs"].extend([match.strip() for match in matches])
+        elements["steps"].extend([match.strip() for match in _find_all(STEP_PATTERNS, text)])
+        elements["decisions"].extend([match.strip() for match in _find_all(DECISION_PATTERNS, text)])
+        elements["handoffs"].extend([match.strip() for match in _find_all(HANDOFF_PATTERNS, text)])
 
         return elements
 
-    def _classify_domain(self, text: str) -> str:
+    def _classify_domain(self, text: str, keyword_hits: Optional[FrozenSet[str]] = None) -> str:
         """Classify the business domain of the conversation"""
-        domain_indicators = {
-            "finance": ["invoice", "payment", "budget", "accounting", "audit", "expense", "revenue", "cost"],
-            "hr": ["hiring", "employee", "onboarding", "performance", "benefits", "payroll", "recruitment"],
-            "engineering": ["development", "code", "deploy", "testing", "bug", "feature", "system", "technical"],
-            "sales": ["lead", "prospect", "deal", "pipeline", "commission", "quota", "crm", "customer"],
-            "marketing": ["campaign", "content", "brand", "social", "advertising", "analytics", "conversion"],
-            "operations": ["supply chain", "logistics", "inventory", "procurement", "vendor", "quality"],
-            "legal": ["contract", "compliance", "regulatory", "agreement", "terms", "policy", "risk"],
-            "customer_service": ["support", "ticket", "resolution", "customer", "service", "escalation"]
-        }
+        hits = self._keyword_hits(text, keyword_hits)
+        domain_scores = Counter()
 
-        text_lower = text.lower()
-        domain_scores = {}
-
-        for domain, indicators in domain_indicators.items():
-            score = sum(1 for indicator in indicators if indicator in text_lower)
-            if score > 0:
-                domain_scores[domain] = score
+        for indicator in hits.intersection(DOMAINS_BY_KEYWORD):
+            domain_scores.update(DOMAINS_BY_KEYWORD[indicator])
 
         if domain_scores:
-            return max(domain_scores.items(), key=lambda x: x[1])[0]
+            # Ties go to the domain listed first, as before
+            return max(DOMAIN_INDICATORS, key=domain_scores.__getitem__)
         return "general"
 
-    def _assess_expertise(self, text: str) -> str:
+    def _assess_expertise(self, text: str, keyword_hits: Optional[FrozenSet[str]] = None) -> str:
         """Assess user's expertise level"""
-        expert_indicators = [
-            "kpi", "sla", "roi", "throughput", "latency", "optimization", "automation",
-            "compliance", "governance", "methodology", "framework", "best practice"
-        ]
-
-        beginner_indicators = [
-            "how do", "what is", "can you explain", "i'm new", "don't understand",
-            "simple", "basic", "help me", "confused", "not sure"
-        ]
-
-        text_lower = text.lower()
+        hits = self._keyword_hits(text, keyword_hits)
 
-        expert_score = sum(1 for indicator in expert_indicators if indicator in text_lower)
-        beginner_score = sum(1 for indicator in beginner_indicators if indicator in text_lower)
+        expert_score = len(hits.intersection(EXPERT_INDICATORS))
+        beginner_score = len(hits.intersection(BEGINNER_INDICATORS))
 
         if expert_score > beginner_score and expert_score >= 2:
             return "expert"
@@ -388,123 +671,46 @@ class AdvancedCaseyAI:
         else:
             return "intermediate"
 
-    def _identify_pain_points(self, text: str) -> List[str]:
+    def _identify_pain_points(self, text: str, keyword_hits: Optional[FrozenSet[str]] = None) -> List[str]:
         """Identify process pain points mentioned"""
-        pain_point_patterns = {
-            "delay": ["slow", "takes too long", "delayed", "waiting", "bottleneck"],
-            "manual_work": ["manual", "by hand", "tedious", "repetitive", "time-consuming"],
-            "errors": ["mistake", "error", "wrong", "incorrect", "inaccurate"],
-            "confusion": ["unclear", "confusing", "don't know", "uncertain", "ambiguous"],
-            "complexity": ["complex", "complicated", "difficult", "hard", "overwhelming"],
-            "communication": ["miscommunication", "not informed", "don't know", "unclear"]
-        }
-
-        text_lower = text.lower()
+        hits = self._keyword_hits(text, keyword_hits)
         identified_pain_points = []
 
-        for pain_type, indicators in pain_point_patterns.items():
-            if any(indicator in text_lower for indicator in indicators):
+        for pain_type, indicators in PAIN_POINT_PATTERNS.items():
+            if not hits.isdisjoint(indicators):
                 identified_pain_points.append(pain_type)
 
         return identified_pain_points
 
-    def _infer_requirements(self, text: str) -> List[str]:
+    def _infer_requirements(self, text: str, keyword_hits: Optional[FrozenSet[str]] = None) -> List[str]:
         """Infer implicit requirements and needs"""
+        hits = self._keyword_hits(text, keyword_hits)
         requirements = []
-        text_lower = text.lower()
 
         # Implicit requirements based on context
-        if any(word in text_lower for word in ["fast", "quick", "urgent", "asap"]):
-            requirements.append("speed_optimization")
-
-        if any(word in text_lower for word in ["accurate", "correct", "precise", "error"]):
-            requirements.append("quality_improvement")
-
-        if any(word in text_lower for word in ["track", "monitor", "measure", "report"]):
-            requirements.append("visibility_metrics")
-
-        if any(word in text_lower for word in ["automate", "automatic", "manual", "tedious"]):
-            requirements.append("automation_opportunity")
-
-        if any(word in text_lower for word in ["approve", "approval", "sign off", "authorize"]):
-            requirements.append("approval_workflow")
-
-        if any(word in text_lower for word in ["compliant", "audit", "regulation", "policy"]):
-            requirements.append("compliance_tracking")
+        for requirement, triggers in REQUIREMENT_TRIGGERS:
+            if not hits.isdisjoint(triggers):
+                requirements.append(requirement)
 
         return requirements
 
+    def _keyword_hits(self, text: str, keyword_hits: Optional[FrozenSet[str]]) -> FrozenSet[str]:
+        """Reuse a turn's keyword scan, or scan ``text`` when called standalone"""
+        if keyword_hits is not None:
+            return keyword_hits
+        return scan_keywords(text.lower())
+
     def _generate_insights(self, analysis: Dict, context: ConversationContext) -> List[ProcessInsight]:
         """Generate AI-powered insights"""
-        insights = []
-
-        # Process optimization insights
-        if "automation_opportunity" in analysis.get("implicit_requirements", []):
-            insights.append(ProcessInsight(
-                type="optimization",
-                confidence=0.85,
-                title="Automation Opportunity Detected",
-                description="This process contains manual steps that could be automated to improve efficiency and reduce errors.",
-                impact="high",
-                actionable_steps=[
-                    "Identify repetitive manual tasks",
-                    "Evaluate automation tools (RPA, workflow engines)",
-                    "Create pilot automation for highest-impact step",
-                    "Measure ROI and expand successful automations"
-                ],
-                metrics={"potential_time_savings": "30-60%", "error_reduction": "80-95%"}
-            ))
-
-        # Risk analysis insights
-        if "delay" in analysis.get("pain_points", []):
-            insights.append(ProcessInsight(
-                type="risk",
-                confidence=0.9,
-                title="Bottleneck Risk Identified",
-                description="Process delays detected. This could impact SLAs and customer satisfaction.",
-                impact="medium",
-                actionable_steps=[
-                    "Map current wait times at each step",
-                    "Identify root cause of delays",
-                    "Implement parallel processing where possible",
-                    "Set up monitoring alerts for SLA breaches"
-                ],
-                metrics={"current_bottleneck_impact": "high", "sla_risk": "medium"}
-            ))
-
-        # Quality improvement insights
-        if "errors" in analysis.get("pain_points", []):
-            insights.append(ProcessInsight(
-                type="performance",
-                confidence=0.8,
-                title="Quality Improvement Opportunity",
-                description="Error patterns suggest need for quality gates and validation checkpoints.",
-                impact="high",
-                actionable_steps=[
-                    "Implement validation checkpoints",
-                    "Create error prevention checklists",
-                    "Add automated quality gates",
-                    "Train team on error prevention"
-                ],
-                metrics={"error_reduction_potential": "70-90%", "rework_savings": "significant"}
-            ))
+        insights = [
+            insight for key, trigger, insight in INSIGHT_RULES
+            if trigger in analysis.get(key, ())
+        ]
 
         # Compliance insights
-        if context.domain in ["finance", "hr", "legal"] and "compliance_tracking" in analysis.get("implicit_requirements", []):
-            insights.append(ProcessInsight(
-                type="compliance",
-                confidence=0.95,
-                title="Compliance Tracking Required",
-                description=f"Processes in {context.domain} domain typically require audit trails and compliance monitoring.",
-                impact="critical",
-                actionable_steps=[
-                    "Implement audit logging",
-                    "Create compliance checkpoints",
-                    "Document approval chains",
-                    "Set up regular compliance reviews"
-                ],
-                metrics={"compliance_coverage": "99%+", "audit_readiness": "high"}
-            ))
+        compliance_insight = COMPLIANCE_INSIGHTS.get(context.domain)
+        if compliance_insight is not None and "compliance_tracking" in analysis.get("implicit_requirements", ()):
+            insights.append(compliance_insight)
 
         return insights
 
@@ -512,31 +718,26 @@ class AdvancedCaseyAI:
         """Generate intelligent, contextual responses"""
 
         # Determine response strategy
-        primary_intent = max(analysis["intent"].items(), key=lambda x: x[1])[0]
-        emotional_state = max(analysis["emotional_state"].items(), key=lambda x: x[1])[0]
+        intents = analysis["intent"]
+        emotions = analysis["emotional_state"]
+        primary_intent = max(intents, key=intents.get)
+        emotional_state = max(emotions, key=emotions.get)
 
         # Adaptive response based on context
-        if emotional_state == "frustrated" and analysis["emotional_state"]["frustrated"] > 0.5:
+        if emotional_state == "frustrated" and emotions["frustrated"] > 0.5:
             return self._generate_empathetic_response(analysis, insights)
-        elif context.user_expertise == "expert":
+        if context.user_expertise == "expert":
             return self._generate_expert_response(analysis, insights)
-        elif primary_intent == "optimize_process":
-            return self._generate_optimization_response(analysis, insights)
-        elif primary_intent == "solve_problem":
-            return self._generate_problem_solving_response(analysis, insights)
 
-        else:
-            return self._generate_discovery_response(analysis, context)
+        # Intent-specific replies, otherwise keep discovering the process
+        intent_responder = self._intent_responders.get(primary_intent)
+        if intent_responder is not None:
+            return intent_responder(analysis, insights)
+        return self._generate_discovery_response(analysis, context)
 
     def _generate_empathetic_response(self, analysis: Dict, insights: List[ProcessInsight]) -> str:
         """Generate empathetic response for frustrated users"""
-        responses = [
-            "I can hear the frustration in what you're describing. Let's break this down into manageable pieces and find some quick wins.",
-            "That does sound challenging. Let me help you identify the biggest pain point we can address first.",
-            "I understand this process is causing headaches. Let's work together to smooth out these rough edges."
-        ]
-
-        base_response = random.choice(responses)
+        base_response = next(self._empathetic_openers)
 
         if insights:
             insight = insights[0]
@@ -569,19 +770,11 @@ class AdvancedCaseyAI:
 
     def _generate_problem_solving_response(self, analysis: Dict, insights: List[ProcessInsight]) -> str:
         """Generate problem-solving focused response"""
-        pain_points = analysis.get("pain_points", [])
+        pain_points = analysis.get("pain_points", ())
 
         if pain_points:
             primary_pain = pain_points[0]
-            solutions = {
-                "delay": "implement parallel processing and eliminate wait states",
-                "manual_work": "automate repetitive tasks and create templates",
-                "errors": "add validation checkpoints and error prevention",
-                "confusion": "create clear documentation and process maps",
-                "complexity": "simplify workflows and reduce decision points"
-            }
-
-            solution = solutions.get(primary_pain, "streamline the workflow")
+            solution = PAIN_POINT_SOLUTIONS.get(primary_pain, "streamline the workflow")
             return f"I can help solve this! The core issue appears to be {primary_pain.replace('_', ' ')}. The most effective approach would be to {solution}. Let's start by mapping out exactly where this problem occurs. Can you walk me through a specific example when this issue last happened?"
 
         return "Let's get to the root of this problem. Can you describe what should happen versus what actually happens? I'll help identify where the process breaks down."
@@ -600,60 +793,80 @@ class AdvancedCaseyAI:
         if not entities.get("timeframes"):
             return "Thanks for sharing that! How long does this typically take from start to finish? And are there any time-sensitive steps or deadlines involved?"
 
-        # Default discovery questions
-        discovery_questions = [
-            "What happens when things go wrong in this process? Understanding failure modes helps identify improvement opportunities.",
-            "How do you currently measure success for this process? Any KPIs or metrics you track?",
-            "What's the most frustrating part of this process for the people involved?",
-            "Are there seasonal variations or peak times when this process gets stressed?",
-            "What would 'perfect' look like for this process if you could wave a magic wand?"
-        ]
-
-        return random.choice(discovery_questions)
+        # Default discovery questions, rotated per conversation
+        question = DISCOVERY_QUESTIONS[context.discovery_index % len(DISCOVERY_QUESTIONS)]
+        context.discovery_index += 1
+        return question
 
 
-    def _update_context(self, user_input: str, context: ConversationContext):
+    def _update_context(self, user_input: str, context: ConversationContext,
+                        analysis: Optional[Dict[str, Any]] = None):
         """Update conversation context based on new input"""
+        if analysis is None:
+            keyword_hits = scan_keywords(user_input.lower())
+            analysis = {
+                "expertise_indicators": self._assess_expertise(user_input, keyword_hits),
+                "domain": self._classify_domain(user_input, keyword_hits),
+                "emotional_state": self._analyze_emotion(user_input, keyword_hits),
+                "pain_points": self._identify_pain_points(user_input, keyword_hits),
+            }
+
         # Update expertise assessment
-        expertise = self._assess_expertise(user_input)
+        expertise = analysis["expertise_indicators"]
         if expertise != "intermediate":  # Only update if we have strong signals
             context.user_expertise = expertise
 
         # Update domain
-        domain = self._classify_domain(user_input)
+        domain = analysis["domain"]
         if domain != "general":
             context.domain = domain
 
         # Update emotional state
-        emotions = self._analyze_emotion(user_input)
-        if emotions:
-            primary_emotion = max(emotions.items(), key=lambda x: x[1])[0]
-            if emotions[primary_emotion] > 0.3:
-                context.emotional_state = primary_emotion
+        # (single pass; ties keep the first emotion, like max())
+        primary_emotion, primary_score = None, -1.0
+        for emotion, score in analysis["emotional_state"].items():
+            if score > primary_score:
+                primary_emotion, primary_score = emotion, score
+        if primary_score > 0.3:
+            context.emotional_state = primary_emotion
 
         # Update goals and pain points
-        pain_points = self._identify_pain_points(user_input)
+        pain_points = analysis["pain_points"]
         for pain_point in pain_points:
             if pain_point not in context.pain_points:
                 context.pain_points.append(pain_point)
 
+    def _forget_conversation(self, conversation_id: str):
+        """Drop learning data for a conversation whose profile was evicted"""
+        self.learning_data.pop(conversation_id, None)
+
     def _update_learning(self, user_input: str, analysis: Dict, conversation_id: str):
         """Update learning data for continuous improvement"""
-        self.learning_data[conversation_id].append({
+        history = self.learning_data[conversation_id]
+        history.append({
             "timestamp": time.time(),
             "input": user_input,
             "analysis": analysis,
-            "context": self.user_profiles[conversation_id].__dict__.copy()
+            "context": self._snapshot_context(self.user_profiles[conversation_id], history)
         })
 
-        # Keep only recent learning data
-        if len(self.learning_data[conversation_id]) > 100:
-            self.learning_data[conversation_id] = self.learning_data[conversation_id][-50:]
+    @staticmethod
+    def _snapshot_context(context: ConversationContext, history: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Point-in-time copy of ``context``, shared with the previous turn when unchanged"""
+        snapshot = {f.name: getattr(context, f.name) for f in fields(context)}
+        snapshot["goals"] = tuple(context.goals)
+        snapshot["pain_points"] = tuple(context.pain_points)
+        snapshot["preferences"] = dict(context.preferences)
+
+        if history and history[-1]["context"] == snapshot:
+            return history[-1]["context"]
+        return snapshot
+
 
 class ProcessClassifier:
     """Classify process types for targeted optimization"""
 
-    def classify(self, process_elements: Dict) -> str:
+    def classify(self, process_elements: Dict, step_hits: Optional[FrozenSet[str]] = None) -> str:
         """Classify process type based on elements"""
         steps = process_elements.get("steps", [])
         decisions = process_elements.get("decisions", [])
@@ -661,16 +874,15 @@ class ProcessClassifier:
         if not steps:
             return "unknown"
 
-        step_text = " ".join(steps).lower()
+        if step_hits is None:
+            step_hits = scan_steps(steps)
+
+        # Classification logic, first matching process type wins
+        for process_type, keywords in PROCESS_TYPE_KEYWORDS:
+            if not step_hits.isdisjoint(keywords):
+                return process_type
 
-        # Classification logic
-        if any(word in step_text for word in ["approve", "review", "authorize", "sign"]):
-            return "approval"
-        elif any(word in step_text for word in ["create", "design", "develop", "build"]):
-            return "creative"
-        elif any(word in step_text for word in ["analyze", "calculate", "report", "measure"]):
-            return "analytical"
-        elif len(decisions) > len(steps) * 0.3:
+        if len(decisions) > len(steps) * 0.3:
             return "decision_heavy"
         else:
             return "operational"
@@ -678,50 +890,36 @@ class ProcessClassifier:
 class ProcessOptimizationEngine:
     """Generate process optimization recommendations"""
 
-    def analyze(self, process_elements: Dict, pain_points: List[str]) -> List[ProcessInsight]:
+    def analyze(self, process_elements: Dict, pain_points: List[str],
+                step_hits: Optional[FrozenSet[str]] = None) -> List[ProcessInsight]:
         """Analyze process for optimization opportunities"""
         insights = []
 
         steps = process_elements.get("steps", [])
+        if step_hits is None:
+            step_hits = scan_steps(steps)
 
         # Analyze for automation opportunities
-        if self._has_automation_potential(steps):
+        if self._has_automation_potential(step_hits):
             insights.append(self._generate_automation_insight(steps))
 
         # Analyze for parallel processing
-        if self._has_parallelization_potential(steps):
+        if self._has_parallelization_potential(steps, step_hits):
             insights.append(self._generate_parallelization_insight(steps))
 
         return insights
 
-    def _has_automation_potential(self, steps: List[str]) -> bool:
-        automation_indicators = ["manual", "copy", "enter", "type", "fill", "check"]
-        return any(indicator in " ".join(steps).lower() for indicator in automation_indicators)
+    def _has_automation_potential(self, step_hits: FrozenSet[str]) -> bool:
+        return not step_hits.isdisjoint(AUTOMATION_INDICATORS)
 
-    def _has_parallelization_potential(self, steps: List[str]) -> bool:
-        return len(steps) > 3 and not any(word in " ".join(steps).lower() for word in ["then", "after", "depends"])
+    def _has_parallelization_potential(self, steps: List[str], step_hits: FrozenSet[str]) -> bool:
+        return len(steps) > 3 and step_hits.isdisjoint(SEQUENCING_WORDS)
 
     def _generate_automation_insight(self, steps: List[str]) -> ProcessInsight:
-        return ProcessInsight(
-            type="optimization",
-            confidence=0.8,
-            title="Automation Opportunity",
-            description="Process contains manual steps suitable for automation",
-            impact="high",
-            actionable_steps=["Identify automation tools", "Create pilot", "Measure ROI"],
-            metrics={"time_savings": "40-60%"}
-        )
+        return STEP_AUTOMATION_INSIGHT
 
     def _generate_parallelization_insight(self, steps: List[str]) -> ProcessInsight:
-        return ProcessInsight(
-            type="optimization",
-            confidence=0.7,
-            title="Parallel Processing Opportunity",
-            description="Steps could be executed in parallel to reduce cycle time",
-            impact="medium",
-            actionable_steps=["Map dependencies", "Identify parallel paths", "Redesign workflow"],
-            metrics={"cycle_time_reduction": "20-40%"}
-        )
+        return PARALLELIZATION_INSIGHT
 
 class RiskAnalysisEngine:
     """Analyze process risks and failure points"""
@@ -743,65 +941,57 @@ class RiskAnalysisEngine:
     def _has_single_point_of_failure(self, process_elements: Dict) -> bool:
         # Simplified logic - real implementation would be more sophisticated
         actors = process_elements.get("actors", [])
-        return len(set(actors)) == 1 if actors else False
+        if not actors:
+            return False
+        first_actor = actors[0]
+        return all(actor == first_actor for actor in actors)
 
     def _has_compliance_risk(self, context: ConversationContext) -> bool:
-        regulated_domains = ["finance", "hr", "legal", "healthcare"]
-        return context.domain in regulated_domains
+        return context.domain in REGULATED_DOMAINS
 
     def _generate_spof_insight(self) -> ProcessInsight:
-        return ProcessInsight(
-            type="risk",
-            confidence=0.9,
-            title="Single Point of Failure Risk",
-            description="Process depends on single person/system creating vulnerability",
-            impact="high",
-            actionable_steps=["Cross-train team members", "Create backup procedures", "Document process"],
-            metrics={"business_continuity_risk": "high"}
-        )
+        return SINGLE_POINT_OF_FAILURE_INSIGHT
 
     def _generate_compliance_insight(self, context: ConversationContext) -> ProcessInsight:
-        return ProcessInsight(
-            type="compliance",
-            confidence=0.85,
-            title="Compliance Documentation Required",
-            description=f"Processes in {context.domain} require audit trails and controls",
-            impact="critical",
-            actionable_steps=["Implement audit logging", "Document approvals", "Regular reviews"],
-            metrics={"compliance_coverage": "required"}
-        )
+        return _compliance_documentation_insight(context.domain)
+
+# Question sequences for each guided conversation flow
+CONVERSATION_FLOWS = MappingProxyType({
+    "process_discovery": (
+        "What triggers this process?",
+        "Who's involved and what are their roles?",
+        "What tools or systems are used?",
+        "How long does it typically take?",
+        "What happens when things go wrong?",
+        "How do you measure success?"
+    ),
+    "problem_solving": (
+        "Can you describe a specific example?",
+        "What should happen vs what actually happens?",
+        "When did this problem first appear?",
+        "Who else is affected by this issue?",
+        "What have you tried so far?",
+        "What would success look like?"
+    ),
+    "optimization": (
+        "What's your biggest bottleneck currently?",
+        "Which step takes the longest?",
+        "Where do errors typically occur?",
+        "What manual steps could be automated?",
+        "How do you handle peak volumes?",
+        "What metrics do you track?"
+    ),
+})
+
+# Asked once a flow runs out of questions
+SYNTHESIS_QUESTION = "Based on everything you've shared, what would you say is the most important improvement to tackle first?"
+
 
 class ConversationAI:
     """Advanced conversation management and flow control"""
 
     def __init__(self):
-        self.conversation_flows = {
-            "process_discovery": [
-                "What triggers this process?",
-                "Who's involved and what are their roles?",
-                "What tools or systems are used?",
-                "How long does it typically take?",
-                "What happens when things go wrong?",
-                "How do you measure success?"
-            ],
-            "problem_solving": [
-                "Can you describe a specific example?",
-                "What should happen vs what actually happens?",
-                "When did this problem first appear?",
-                "Who else is affected by this issue?",
-                "What have you tried so far?",
-                "What would success look like?"
-            ],
-            "optimization": [
-                "What's your biggest bottleneck currently?",
-                "Which step takes the longest?",
-                "Where do errors typically occur?",
-                "What manual steps could be automated?",
-                "How do you handle peak volumes?",
-                "What metrics do you track?"
-
-            ]
-        }
+        self.conversation_flows = CONVERSATION_FLOWS
 
     def get_next_question(self, flow_type: str, conversation_stage: int) -> str:
         """Get contextually appropriate next question"""
@@ -811,5 +1001,4 @@ class ConversationAI:
             return flow[conversation_stage]
         else:
             # Generate synthesis question
-            return "Based on everything you've shared, what would you say is the most important improvement to tackle first?"
-
+            return SYNTHESIS_QUESTION
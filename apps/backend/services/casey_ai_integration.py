@@ -1,30 +1,369 @@
+import contextlib
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, List, Any, Optional
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 from datetime import datetime
+from enum import Enum
+from types import MappingProxyType
 import asyncio
 
 try:
-    import openai
+    import httpx
+    from openai import AsyncOpenAI, BadRequestError
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 from ..services.models import CreativeProject, ProjectQuestion, ProjectInsight, ProjectComment
 from ..schemas import ProjectType
 
+
+class DuplicateLogFilter(logging.Filter):
+    """Drop repeats of the same log message and exception type within a short window.
+
+    A provider outage fails every in-flight call the same way; one line per
+    window is enough to see it without flooding the logs.
+    """
+
+    def __init__(self, window_seconds: float = 1.0):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self._last_emitted: Dict[Tuple[str, int, Optional[str]], float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (str(record.msg), record.levelno, exc_type)
+        now = time.monotonic()
+        last = self._last_emitted.get(key)
+        if last is not None and now - last < self.window_seconds:
+            return False
+        self._last_emitted[key] = now
+        return True
+
+
+logger = logging.getLogger(__name__)
+logger.addFilter(DuplicateLogFilter())
+
+# Project contexts are reused for this long unless the project row changes
+CONTEXT_CACHE_TTL_SECONDS = float(os.getenv("CASEY_CONTEXT_CACHE_TTL", "60"))
+CONTEXT_CACHE_MAX_ENTRIES = 1024
+
+# Connection pool shared by every OpenAI request the service makes
+OPENAI_MAX_CONNECTIONS = 100
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 50
+OPENAI_TIMEOUT_SECONDS = 30.0
+# Rate limits, timeouts, connection errors and 5xx responses are retried with
+# jittered exponential backoff that honours Retry-After
+OPENAI_MAX_RETRIES = int(os.getenv("CASEY_LLM_MAX_RETRIES", "5"))
+
+# Client-side limits kept below the account quota to avoid 429 retry storms
+LLM_MAX_CONCURRENT = int(os.getenv("CASEY_MAX_CONCURRENT", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("CASEY_LLM_RPM", "3500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("CASEY_LLM_TPM", "90000"))
+
+# Completions of calls that opt in are reused for identical requests within this window
+LLM_CACHE_TTL_SECONDS = float(os.getenv("CASEY_LLM_CACHE_TTL", "3600"))
+LLM_CACHE_MAX_ENTRIES = 2048
+
+# Response parsing, compiled once
+# Sentences (split on ".") mentioning a recommendation verb
+RECOMMENDATION_RE = re.compile(
+    r"(?:^|(?<=\.))[^.]*?(?:recommend|suggest|consider|should|could|try)[^.]*", re.I | re.A
+)
+
+# Structured output schema for single-project analyses
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "project_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "summary": {"type": "string"},
+                "key_points": {"type": "array", "items": {"type": "string"}},
+                "recommendations": {"type": "array", "items": {"type": "string"}},
+                "confidence": {"type": "number"},
+                "next_questions": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["summary", "key_points", "recommendations", "confidence", "next_questions"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Casey's system prompts for each kind of request
+CASEY_PERSONALITY = MappingProxyType({
+    "project_analyst": """You are Casey, an enthusiastic and insightful creative project analyst. 
+            You provide detailed, actionable feedback on creative projects with a focus on design principles, 
+            user experience, and creative impact. You're encouraging but honest, and always suggest specific 
+            improvements. You understand various creative disciplines and current design trends.""",
+
+    "conversational": """You are Casey, a friendly and knowledgeable creative consultant. 
+            You engage in natural conversation about creative projects, offering insights, suggestions, 
+            and encouragement. You remember project context and can discuss specific details. 
+            You're enthusiastic about creativity and design, and you adapt your communication style 
+            to be helpful and engaging.""",
+
+    "creative_advisor": """You are Casey, a creative advisor who specializes in generating 
+            innovative suggestions for design improvements. You think outside the box while staying 
+            practical, and you consider current trends, user needs, and project goals when making 
+            recommendations.""",
+
+    "trend_analyst": """You are Casey, a design trend analyst who stays current with the 
+            latest developments in creative industries. You evaluate projects against contemporary 
+            design movements, emerging technologies, and cultural shifts that influence creative work.""",
+
+    "storyteller": """You are Casey, a creative storyteller who can weave engaging narratives 
+            about project journeys, team collaborations, and creative processes. You celebrate 
+            milestones, acknowledge challenges, and create compelling project histories."""
+})
+
+# Structured prompts for different types of analysis
+ANALYSIS_PROMPTS = MappingProxyType({
+    "comprehensive": """Analyze this creative project comprehensively:
+
+Project Details: {project_info}
+User Responses: {answered_questions}
+Current Insights: {insights}
+Team Feedback: {team_feedback}
+
+Please provide:
+1. Overall assessment and strengths
+1. Areas for improvement
+1. Specific actionable recommendations
+1. Creative suggestions for enhancement
+1. Next steps for project completion
+
+Be specific, encouraging, and practical in your feedback.""",
+
+    "conversation": """Continue this conversation about the creative project:
+
+Project Context: {project_info}
+User Message: {user_message}
+
+Respond as Casey - be helpful, specific to this project, and maintain an encouraging but professional tone.
+Reference specific project details when relevant.""",
+
+    "suggestions": """Generate creative suggestions for this {project_type} project focusing on {focus_area}:
+
+Project: {project_name}
+Current Status: {status}
+Available Details: {project_details}
+
+Provide 5-8 specific, actionable suggestions that would improve the project."""
+})
+
+TEXT_SUMMARY_INSTRUCTIONS = """Summarize the text extracted from a creative project file. Keep the key \
+messages, audience, calls to action and any brand or product names. Reply with the summary only."""
+
+# Canned content used when the LLM is unavailable; callers get list copies
+FALLBACK_KEY_POINTS = (
+    "Project successfully uploaded and processed",
+    "Basic technical analysis completed",
+    "Ready for team collaboration and feedback"
+)
+FALLBACK_RECOMMENDATIONS = (
+    "Share with team members for feedback",
+    "Review technical specifications for your target platform",
+    "Consider accessibility and user experience factors"
+)
+FALLBACK_NEXT_QUESTIONS = (
+    "What specific aspect would you like me to focus on?",
+    "Are there any particular design goals you're trying to achieve?",
+    "Would you like suggestions for improvement in any area?"
+)
+FALLBACK_SUGGESTIONS = MappingProxyType({
+    "website_mockup": (
+        "Ensure responsive design across all device sizes",
+        "Optimize loading times and performance",
+        "Implement clear visual hierarchy with typography",
+        "Add accessibility features (alt text, contrast)",
+        "Consider user flow and navigation patterns"
+    ),
+    "social_media": (
+        "Optimize dimensions for target platform",
+        "Use high-contrast colors for mobile viewing",
+        "Keep text large and readable on small screens",
+        "Include clear call-to-action elements",
+        "Test across different social media formats"
+    ),
+    "print_graphic": (
+        "Verify color mode (CMYK for printing)",
+        "Add proper bleed and margin areas",
+        "Check resolution for print quality (300 DPI)",
+        "Consider paper type and finish effects",
+        "Review typography for print legibility"
+    )
+})
+DEFAULT_FALLBACK_SUGGESTIONS = (
+    "Focus on clear visual hierarchy",
+    "Ensure consistent branding elements",
+    "Optimize for your target audience",
+    "Consider accessibility requirements",
+    "Test across relevant platforms/devices"
+)
+FALLBACK_TRENDING_ELEMENTS = ("clean layouts", "bold typography", "accessibility focus")
+FALLBACK_TREND_RECOMMENDATIONS = (
+    "Consider incorporating sustainable design principles",
+    "Explore micro-interactions for engagement",
+    "Review current accessibility standards"
+)
+
+# Per-task model tiers; CASEY_LLM_MODEL pins every task to one model and
+# CASEY_<TASK>_MODEL overrides a single task
+LLM_TASK_MODELS = {
+    "analysis": "gpt-4o",
+    "chat": "gpt-4o-mini",
+    "suggestions": "gpt-4o-mini",
+    "story": "gpt-4o-mini",
+    "trends": "gpt-4o",
+    "summary": "gpt-4o-mini"
+}
+
+# Answered questions beyond this many serialized characters are left out of prompts
+ANSWERED_QUESTIONS_PROMPT_CHARS = 2048
+
+# Extracted text longer than the prompt excerpt is summarised once with a
+# map-reduce pass and the summary kept in project_metadata
+EXTRACTED_TEXT_PROMPT_CHARS = 500
+SUMMARY_CHUNK_CHARS = 8000  # ~2k tokens per map call
+SUMMARY_MAX_TOKENS = 300
+
+# Suggestions are shared between projects with the same design fingerprint
+# for the same LLM_CACHE_TTL_SECONDS window as completions
+SUGGESTION_CACHE_MAX_ENTRIES = 1024
+
+# Completion budget per project when several are analysed in one request
+BULK_ANALYSIS_TOKENS_PER_PROJECT = 800
+# Completion token limits per model; bulk analyses are split so no request
+# asks for more, and unlisted models get the conservative default
+MODEL_MAX_OUTPUT_TOKENS = MappingProxyType({
+    "gpt-4o": 16384,
+    "gpt-4o-mini": 16384,
+})
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+# Batch API statuses that will not change again
+BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+@dataclass(frozen=True, slots=True)
+class BatchJob:
+    """One chat completion queued for the OpenAI Batch API"""
+    custom_id: str
+    model: str
+    messages: Tuple[Dict[str, str], ...]
+    max_tokens: int
+    temperature: float
+
+
+@dataclass(frozen=True, slots=True)
+class BatchResult:
+    """A finished Batch API job: completions by custom_id and the requests that failed"""
+    status: str
+    completions: Dict[str, str]
+    errors: List[Dict[str, Any]]
+
+
+def _enum_value(value: Any) -> Any:
+    """The stored value of an Enum column, so prompts and fallbacks handle plain strings"""
+    return value.value if isinstance(value, Enum) else value
+
+
+def _stable_json(value: Any) -> str:
+    """Serialize prompt data identically for identical inputs"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class TokenBucket:
+    """Request and token budgets that refill continuously over a minute"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.capacity = {"requests": float(requests_per_minute), "tokens": float(tokens_per_minute)}
+        self.available = dict(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        for kind, capacity in self.capacity.items():
+            self.available[kind] = min(capacity, self.available[kind] + capacity * elapsed / 60)
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and ``tokens`` tokens fit in the budget"""
+        tokens = min(tokens, self.capacity["tokens"])
+        async with self._lock:
+            while True:
+                self._refill()
+                missing_requests = 1 - self.available["requests"]
+                missing_tokens = tokens - self.available["tokens"]
+                if missing_requests <= 0 and missing_tokens <= 0:
+                    self.available["requests"] -= 1
+                    self.available["tokens"] -= tokens
+                    return
+                await asyncio.sleep(60 * max(
+                    missing_requests / self.capacity["requests"],
+                    missing_tokens / self.capacity["tokens"],
+                ))
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Never assume more budget than the API reports as remaining"""
+        for kind in self.capacity:
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                self.available[kind] = min(self.available[kind], float(remaining))
+            except ValueError:
+                continue
+
 class CaseyAIService:
     """Advanced AI integration for Casey's creative project analysis"""
 
     def __init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.model = os.getenv("CASEY_LLM_MODEL", "gpt-4")
-        self.casey_personality = self._load_casey_personality()
-        self.project_analysis_prompts = self._load_analysis_prompts()
+        self.models = {
+            task: os.getenv(f"CASEY_{task.upper()}_MODEL", os.getenv("CASEY_LLM_MODEL", model))
+            for task, model in LLM_TASK_MODELS.items()
+        }
+        self.casey_personality = CASEY_PERSONALITY
+        self.project_analysis_prompts = ANALYSIS_PROMPTS
+        # project_id -> (cached_at, project revision, context)
+        self._context_cache: Dict[int, Tuple[float, Tuple[Any, ...], Dict[str, Any]]] = {}
+        self.client = None
+        self._llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENT)
+        self._rate_limiter = TokenBucket(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+        # request digest -> (cached_at, completion text), least recently used first
+        self._response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # design fingerprint -> (cached_at, suggestions), least recently used first
+        self._suggestion_cache: "OrderedDict[str, Tuple[float, Tuple[str, ...]]]" = OrderedDict()
+        # Models that rejected the json_schema response format
+        self._no_structured_output_models: Set[str] = set()
         
         if OPENAI_AVAILABLE and self.openai_api_key:
-            openai.api_key = self.openai_api_key
+            self.client = AsyncOpenAI(
+                api_key=self.openai_api_key,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    ),
+                    timeout=OPENAI_TIMEOUT_SECONDS,
+                ),
+            )
 
     async def analyze_project_with_ai(self, project_id: int, db: Session) -> Dict[str, Any]:
         """Generate AI-powered analysis of a creative project"""
@@ -35,34 +374,59 @@ class CaseyAIService:
         if not project_context:
             return self._fallback_analysis("Project not found")
         
-        # Generate AI analysis
-        if OPENAI_AVAILABLE and self.openai_api_key:
-            try:
-                analysis = await self._generate_ai_analysis(project_context)
-                return analysis
-            except Exception as e:
-                print(f"AI analysis failed: {e}")
-                return self._fallback_analysis("AI analysis temporarily unavailable")
-        else:
-            return self._fallback_analysis("AI analysis requires OpenAI API configuration")
+        return await self._analyze_context(project_context)
 
     async def chat_about_project(self, project: CreativeProject, user_message: str, 
-                               user_id: int, db: Session) -> str:
+                               user_id: int, db: Session,
+                               conversation_history: Optional[List[Dict[str, str]]] = None) -> str:
         """Handle chat conversation about a specific project"""
         
-        # Gather project context for conversation
-        project_context = await self._gather_project_context(project.id, db)
+        # Chat prompts only use the project's own fields, which the caller has loaded
+        project_context = self._build_context_from_project(project)
         
         if OPENAI_AVAILABLE and self.openai_api_key:
             try:
-                response = await self._generate_chat_response(project_context, user_message)
+                response = await self._generate_chat_response(project_context, user_message, conversation_history)
                 return response
-            except Exception as e:
-                print(f"AI chat failed: {e}")
+            except Exception:
+                logger.exception("AI chat failed",
+                                 extra={"method": "chat_about_project", "project_id": project.id})
                 return self._fallback_chat_response(project, user_message)
         else:
             return self._fallback_chat_response(project, user_message)
 
+    async def stream_chat_about_project(self, project: CreativeProject, user_message: str,
+                                        user_id: int, db: Session,
+                                        conversation_history: Optional[List[Dict[str, str]]] = None
+                                        ) -> AsyncIterator[str]:
+        """Stream Casey's chat reply as it is generated"""
+        
+        project_context = self._build_context_from_project(project)
+        
+        if not OPENAI_AVAILABLE or not self.openai_api_key:
+            yield self._fallback_chat_response(project, user_message)
+            return
+        
+        streamed = False
+        try:
+            # aclosing() passes an early exit by the consumer through to the
+            # inner stream, which then closes its response and frees its slot
+            async with contextlib.aclosing(self._stream_llm(
+                self._conversation_messages(project_context, user_message, conversation_history),
+                model=self.models["chat"],
+                max_tokens=300,
+                temperature=0.7
+            )) as deltas:
+                async for delta in deltas:
+                    streamed = True
+                    yield delta
+        except Exception:
+            logger.exception("AI chat stream failed",
+                             extra={"method": "stream_chat_about_project", "project_id": project.id})
+            # Only fall back if the user has not already seen a partial reply
+            if not streamed:
+                yield self._fallback_chat_response(project, user_message)
+
     async def generate_creative_suggestions(self, project: CreativeProject, 
                                           focus_area: str = "general") -> List[str]:
         """Generate creative suggestions for improvement"""
@@ -70,33 +434,45 @@ class CaseyAIService:
         if not OPENAI_AVAILABLE or not self.openai_api_key:
             return self._fallback_suggestions(project, focus_area)
         
+        # A structurally identical project already has suggestions
+        fingerprint = self._design_fingerprint(project, focus_area)
+        cached = self._suggestion_cache.get(fingerprint)
+        if cached and time.monotonic() - cached[0] < LLM_CACHE_TTL_SECONDS:
+            self._suggestion_cache.move_to_end(fingerprint)
+            return list(cached[1])
+        
         try:
             suggestions_prompt = self._build_suggestions_prompt(project, focus_area)
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
+            suggestions_text = await self._call_llm(
+                [
                     {"role": "system", "content": self.casey_personality["creative_advisor"]},
                     {"role": "user", "content": suggestions_prompt}
                 ],
+                model=self.models["suggestions"],
                 max_tokens=500,
                 temperature=0.7
             )
             
-            suggestions_text = response.choices[0].message.content
-            
             # Parse suggestions from response
             suggestions = []
             for line in suggestions_text.split('\n'):
-                if line.strip() and (line.startswith('-') or line.startswith('•') or line.startswith('*')):
+                if line.startswith(('-', '•', '*')):
                     suggestion = line.strip().lstrip('-•*').strip()
                     if suggestion:
                         suggestions.append(suggestion)
+                        if len(suggestions) == 8:  # Limit to 8 suggestions
+                            break
+            if suggestions:
+                self._suggestion_cache[fingerprint] = (time.monotonic(), tuple(suggestions))
+                self._suggestion_cache.move_to_end(fingerprint)
+                if len(self._suggestion_cache) > SUGGESTION_CACHE_MAX_ENTRIES:
+                    self._suggestion_cache.popitem(last=False)
+            return suggestions
             
-            return suggestions[:8]  # Limit to 8 suggestions
-            
-        except Exception as e:
-            print(f"AI suggestions failed: {e}")
+        except Exception:
+            logger.exception("AI suggestions failed",
+                             extra={"method": "generate_creative_suggestions", "project_id": project.id})
             return self._fallback_suggestions(project, focus_area)
 
     async def evaluate_design_trends(self, project: CreativeProject) -> Dict[str, Any]:
@@ -106,20 +482,12 @@ class CaseyAIService:
             return self._fallback_trends_analysis(project)
         
         try:
-            trends_prompt = self._build_trends_prompt(project)
-            
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.casey_personality["trend_analyst"]},
-                    {"role": "user", "content": trends_prompt}
-                ],
-                max_tokens=600,
-                temperature=0.6
+            job = self._trends_job(project)
+            trends_analysis = await self._call_llm(
+                list(job.messages), cache=True,
+                model=job.model, max_tokens=job.max_tokens, temperature=job.temperature
             )
             
-            trends_analysis = response.choices[0].message.content
-            
             return {
                 "analysis": trends_analysis,
                 "trend_alignment_score": 0.7,  # Would parse from AI response
@@ -131,121 +499,574 @@ class CaseyAIService:
                 ]
             }
             
-        except Exception as e:
-            print(f"Trends analysis failed: {e}")
+        except Exception:
+            logger.exception("Trends analysis failed",
+                             extra={"method": "evaluate_design_trends", "project_id": project.id})
             return self._fallback_trends_analysis(project)
 
     async def generate_project_story(self, project: CreativeProject, db: Session) -> str:
         """Generate a narrative story about the project's journey"""
         
         # Get project timeline
-        comments = db.query(ProjectComment).filter(ProjectComment.project_id == project.id).all()
-        insights = db.query(ProjectInsight).filter(ProjectInsight.project_id == project.id).all()
+        comments_count, insights_count = await self._run_db(self._count_timeline, db, project.id)
+        
+        story_context = self._build_story_context(project, comments_count, insights_count)
+        return await self._tell_story(story_context)
+
+    async def analyze_projects_bulk(self, project_ids: List[int], db: Session) -> Dict[int, Dict[str, Any]]:
+        """Analyze several projects with as few LLM requests as the model's output limit allows"""
+        
+        contexts = {}
+        for project_id in project_ids:
+            project_context = await self._gather_project_context(project_id, db)
+            if project_context:
+                contexts[project_id] = project_context
+        
+        results = {
+            project_id: self._fallback_analysis("Project not found")
+            for project_id in project_ids if project_id not in contexts
+        }
+        if not contexts:
+            return results
+        
+        analyses = {}
+        if OPENAI_AVAILABLE and self.openai_api_key:
+            max_output_tokens = MODEL_MAX_OUTPUT_TOKENS.get(self.models["analysis"], DEFAULT_MAX_OUTPUT_TOKENS)
+            per_request = max(1, max_output_tokens // BULK_ANALYSIS_TOKENS_PER_PROJECT)
+            items = list(contexts.items())
+            for group_analyses in await asyncio.gather(*(
+                self._request_bulk_analyses(dict(items[i:i + per_request]))
+                for i in range(0, len(items), per_request)
+            )):
+                analyses.update(group_analyses)
+        
+        for project_id, analysis_text in analyses.items():
+            results[project_id] = self._build_analysis_result(analysis_text, contexts[project_id])
+        
+        # Projects the batched reply missed are analysed individually
+        missing = [project_id for project_id in contexts if project_id not in analyses]
+        for project_id, analysis in zip(missing, await asyncio.gather(
+            *(self._analyze_context(contexts[project_id]) for project_id in missing)
+        ), strict=True):
+            results[project_id] = analysis
+        
+        return results
+
+    async def _request_bulk_analyses(self, contexts: Dict[int, Dict[str, Any]]) -> Dict[int, str]:
+        """Ask for the analyses of one group of projects; projects the reply misses are left out"""
+        
+        analyses = {}
+        try:
+            response_text = await self._call_llm(
+                [
+                    {"role": "system", "content": self.casey_personality["project_analyst"]},
+                    {"role": "user", "content": self._build_bulk_analysis_prompt(contexts)}
+                ],
+                model=self.models["analysis"],
+                cache=True,
+                max_tokens=BULK_ANALYSIS_TOKENS_PER_PROJECT * len(contexts),
+                temperature=0.6,
+                response_format={"type": "json_object"}
+            )
+            for item in json.loads(response_text).get("analyses", []):
+                if item.get("id") in contexts and item.get("analysis"):
+                    analyses[item["id"]] = str(item["analysis"])
+        except Exception:
+            logger.exception("Bulk AI analysis failed",
+                             extra={"method": "analyze_projects_bulk", "project_id": list(contexts)})
+        return analyses
+
+    async def summarize_extracted_text(self, project: CreativeProject, db: Session) -> Optional[str]:
+        """Summarize long extracted text once and store it in the project's metadata"""
+        
+        text = project.extracted_text
+        if not text or len(text) <= EXTRACTED_TEXT_PROMPT_CHARS:
+            return None
+        if not OPENAI_AVAILABLE or not self.openai_api_key:
+            return None
+        
+        metadata = project.project_metadata or {}
+        source_digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if metadata.get("text_summary_source") == source_digest:
+            return metadata.get("text_summary")
+        
+        try:
+            # Map: summarize chunks concurrently under the shared rate limits
+            chunks = [text[i:i + SUMMARY_CHUNK_CHARS] for i in range(0, len(text), SUMMARY_CHUNK_CHARS)]
+            partials = await asyncio.gather(*(
+                self._call_llm(
+                    [
+                        {"role": "system", "content": TEXT_SUMMARY_INSTRUCTIONS},
+                        {"role": "user", "content": chunk}
+                    ],
+                    model=self.models["summary"],
+                    cache=True,
+                    max_tokens=SUMMARY_MAX_TOKENS,
+                    temperature=0.2
+                )
+                for chunk in chunks
+            ))
+            # Reduce: combine the partial summaries into one
+            summary = partials[0] if len(partials) == 1 else await self._call_llm(
+                [
+                    {"role": "system", "content": TEXT_SUMMARY_INSTRUCTIONS},
+                    {"role": "user", "content": "\n\n".join(partials)}
+                ],
+                model=self.models["summary"],
+                cache=True,
+                max_tokens=SUMMARY_MAX_TOKENS,
+                temperature=0.2
+            )
+        except Exception:
+            logger.exception("Text summarization failed",
+                             extra={"method": "summarize_extracted_text", "project_id": project.id})
+            return None
+        
+        # Assign a new dict so the JSON column registers the change
+        project.project_metadata = {**metadata, "text_summary": summary, "text_summary_source": source_digest}
+        await self._run_db(db.commit)
+        return summary
+
+    async def generate_full_report(self, project: CreativeProject, db: Session) -> Dict[str, Any]:
+        """Generate analysis, suggestions, trends and story in one concurrent pass"""
+        
+        # Gather the context once; the four LLM calls are independent
+        project_context = await self._gather_project_context(project.id, db)
+        if not project_context:
+            return {"analysis": self._fallback_analysis("Project not found")}
+        
+        story_context = self._build_story_context(
+            project, len(project_context["team_feedback"]), len(project_context["insights"])
+        )
+        analysis, suggestions, trends, story = await asyncio.gather(
+            self._analyze_context(project_context),
+            self.generate_creative_suggestions(project),
+            self.evaluate_design_trends(project),
+            self._tell_story(story_context),
+        )
+        
+        return {
+            "analysis": analysis,
+            "suggestions": suggestions,
+            "trends": trends,
+            "story": story
+        }
+
+    # === BATCH API ===
+
+    def trends_batch_job(self, project: CreativeProject) -> BatchJob:
+        """Queue a design trends evaluation for the Batch API"""
+        return self._trends_job(project, custom_id=f"trends-{project.id}")
+
+    def story_batch_job(self, project: CreativeProject, db: Session) -> BatchJob:
+        """Queue a project story for the Batch API"""
+        story_context = self._build_story_context(project, *self._count_timeline(db, project.id))
+        return self._story_job(story_context, custom_id=f"story-{project.id}")
+
+    async def submit_batch(self, jobs: List[BatchJob]) -> str:
+        """Upload jobs to the Batch API and return the batch id"""
+        
+        lines = [
+            json.dumps({
+                "custom_id": job.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": job.model,
+                    "messages": list(job.messages),
+                    "max_tokens": job.max_tokens,
+                    "temperature": job.temperature
+                }
+            })
+            for job in jobs
+        ]
+        client = self._batch_client()
+        batch_file = await client.files.create(
+            file=("casey_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+
+    async def collect_batch(self, batch_id: str) -> Optional[BatchResult]:
+        """Return the outcome of a finished batch, or None while it is still running
+
+        Failed, expired and cancelled batches are finished too; their result
+        carries whatever completed plus one entry per failed request.
+        """
+        
+        client = self._batch_client()
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status not in BATCH_FINAL_STATUSES:
+            return None
+        
+        completions = {}
+        errors = []
+        # Validation failures are reported on the batch rather than per request
+        if batch.errors and batch.errors.data:
+            errors.extend(
+                {"custom_id": None, "status_code": None, "error": error.model_dump(exclude_none=True)}
+                for error in batch.errors.data
+            )
+        if batch.output_file_id:
+            for record in await self._batch_records(batch.output_file_id):
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    completions[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+                else:
+                    errors.append(self._batch_error(record))
+        if batch.error_file_id:
+            errors.extend(self._batch_error(record) for record in await self._batch_records(batch.error_file_id))
         
-        story_context = {
+        return BatchResult(status=batch.status, completions=completions, errors=errors)
+
+    # === PRIVATE METHODS ===
+
+    def _batch_client(self) -> "AsyncOpenAI":
+        """The OpenAI client; batches have no offline fallback"""
+        if not OPENAI_AVAILABLE or not self.openai_api_key or self.client is None:
+            raise RuntimeError("The Batch API requires OpenAI API configuration")
+        return self.client
+
+    async def _batch_records(self, file_id: str) -> List[Dict[str, Any]]:
+        """Parse a Batch API JSONL result file"""
+        content = await self.client.files.content(file_id)
+        return [json.loads(line) for line in content.text.splitlines() if line.strip()]
+
+    @staticmethod
+    def _batch_error(record: Dict[str, Any]) -> Dict[str, Any]:
+        """One failed batch request, from an output or error file line"""
+        response = record.get("response") or {}
+        return {
+            "custom_id": record.get("custom_id"),
+            "status_code": response.get("status_code"),
+            "error": record.get("error") or (response.get("body") or {}).get("error")
+        }
+
+    def _trends_job(self, project: CreativeProject, custom_id: str = "") -> BatchJob:
+        """Messages and sampling options for a trends evaluation"""
+        return BatchJob(
+            custom_id=custom_id,
+            model=self.models["trends"],
+            messages=(
+                {"role": "system", "content": self.casey_personality["trend_analyst"]},
+                {"role": "user", "content": self._build_trends_prompt(project)}
+            ),
+            max_tokens=600,
+            temperature=0.6
+        )
+
+    def _story_job(self, story_context: Dict[str, Any], custom_id: str = "") -> BatchJob:
+        """Messages and sampling options for a project story"""
+        return BatchJob(
+            custom_id=custom_id,
+            model=self.models["story"],
+            messages=(
+                {"role": "system", "content": self.casey_personality["storyteller"]},
+                {"role": "user", "content": self._build_story_prompt(story_context)}
+            ),
+            max_tokens=400,
+            temperature=0.8
+        )
+
+    async def _analyze_context(self, project_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the AI analysis for a gathered context, falling back when unavailable"""
+        
+        if OPENAI_AVAILABLE and self.openai_api_key:
+            try:
+                return await self._generate_ai_analysis(project_context)
+            except Exception:
+                logger.exception("AI analysis failed",
+                                 extra={"method": "analyze_project_with_ai",
+                                        "project_id": project_context["project"]["id"]})
+                return self._fallback_analysis("AI analysis temporarily unavailable")
+        else:
+            return self._fallback_analysis("AI analysis requires OpenAI API configuration")
+
+    def _build_story_context(self, project: CreativeProject, comments_count: int,
+                             insights_count: int) -> Dict[str, Any]:
+        """Summarize the project's timeline for the storyteller prompt"""
+        
+        return {
+            "project_id": project.id,
             "project_name": project.name,
-            "project_type": project.project_type,
+            "project_type": _enum_value(project.project_type),
             "created_date": project.created_at.strftime("%B %d, %Y"),
-            "status": getattr(project, 'status', 'draft'),
-            "comments_count": len(comments),
-            "insights_count": len(insights),
-            "has_team_feedback": len(comments) > 0
+            "status": _enum_value(project.status),
+            "comments_count": comments_count,
+            "insights_count": insights_count,
+            "has_team_feedback": comments_count > 0
         }
+
+    async def _tell_story(self, story_context: Dict[str, Any]) -> str:
+        """Narrate the project's journey, falling back when AI is unavailable"""
         
         if OPENAI_AVAILABLE and self.openai_api_key:
             try:
-                story_prompt = self._build_story_prompt(story_context)
-                
-                response = await openai.ChatCompletion.acreate(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": self.casey_personality["storyteller"]},
-                        {"role": "user", "content": story_prompt}
-                    ],
-                    max_tokens=400,
-                    temperature=0.8
+                job = self._story_job(story_context)
+                return await self._call_llm(
+                    list(job.messages), model=job.model, max_tokens=job.max_tokens, temperature=job.temperature
                 )
-                
-                return response.choices[0].message.content
-                
-            except Exception as e:
-                print(f"Story generation failed: {e}")
+            except Exception:
+                logger.exception("Story generation failed",
+                                 extra={"method": "generate_project_story",
+                                        "project_id": story_context["project_id"]})
                 return self._fallback_story(story_context)
         else:
             return self._fallback_story(story_context)
 
-    # === PRIVATE METHODS ===
+    async def _call_llm(self, messages: List[Dict[str, str]], cache: bool = False, **kwargs: Any) -> str:
+        """Send a chat completion through the concurrency and rate limits.
+
+        With ``cache`` an identical request within the cache TTL reuses the
+        earlier completion; only analytic calls opt in. Creative suggestions
+        are reused separately, by design fingerprint.
+        """
+
+        kwargs.setdefault("model", self.model)
+        cache_key = self._completion_cache_key(messages, kwargs) if cache else None
+        if cache_key:
+            cached = self._cached_completion(cache_key)
+            if cached is not None:
+                return cached
+
+        async with self._llm_semaphore:
+            await self._rate_limiter.acquire(self._estimate_tokens(messages, kwargs))
+            raw = await self.client.chat.completions.with_raw_response.create(messages=messages, **kwargs)
+            self._rate_limiter.update_from_headers(raw.headers)
+
+        content = raw.parse().choices[0].message.content
+        if cache_key:
+            self._store_completion(cache_key, content)
+        return content
+
+    async def _stream_llm(self, messages: List[Dict[str, str]], cache: bool = False,
+                          **kwargs: Any) -> AsyncIterator[str]:
+        """Stream a chat completion's text deltas through the same limits and opt-in cache"""
+
+        kwargs.setdefault("model", self.model)
+        cache_key = self._completion_cache_key(messages, kwargs) if cache else None
+        if cache_key:
+            cached = self._cached_completion(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        async with self._llm_semaphore:
+            await self._rate_limiter.acquire(self._estimate_tokens(messages, kwargs))
+            raw = await self.client.chat.completions.with_raw_response.create(
+                messages=messages, stream=True, **kwargs
+            )
+            self._rate_limiter.update_from_headers(raw.headers)
+            # Closing the stream on any exit releases the HTTP response with the slot
+            async with raw.parse() as stream:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+
+        if cache_key:
+            self._store_completion(cache_key, "".join(parts))
+
+    def _completion_cache_key(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> str:
+        return hashlib.sha256(
+            json.dumps([messages, kwargs], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def _cached_completion(self, cache_key: str) -> Optional[str]:
+        cached = self._response_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < LLM_CACHE_TTL_SECONDS:
+            self._response_cache.move_to_end(cache_key)
+            return cached[1]
+        return None
+
+    def _store_completion(self, cache_key: str, content: str) -> None:
+        self._response_cache[cache_key] = (time.monotonic(), content)
+        self._response_cache.move_to_end(cache_key)
+        if len(self._response_cache) > LLM_CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> int:
+        # Rough prompt size (~4 characters per token) plus the completion budget
+        return sum(len(m["content"]) for m in messages) // 4 + kwargs.get("max_tokens", 0)
+
+    async def _run_db(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking Session work in a worker thread so the event loop stays free.
+        
+        Calls are awaited one at a time; a Session must never be used from two
+        threads at once, so queries on the same ``db`` are not gathered.
+        """
+        return await asyncio.to_thread(fn, *args)
+
+    @staticmethod
+    def _load_project_revision(db: Session, project_id: int) -> Optional[Tuple[Any, ...]]:
+        # Writing a question, insight or comment leaves the project's
+        # updated_at alone, so their counts and latest timestamps are part of
+        # the revision; any added, answered, edited or deleted row changes it
+        def child(model: Any, aggregate: Any) -> Any:
+            return select(aggregate).where(model.project_id == project_id).scalar_subquery()
+        
+        row = db.execute(
+            select(
+                CreativeProject.updated_at,
+                child(ProjectQuestion, func.count()),
+                child(ProjectQuestion, func.sum(ProjectQuestion.is_answered)),
+                child(ProjectQuestion, func.max(ProjectQuestion.answered_at)),
+                child(ProjectInsight, func.count()),
+                child(ProjectInsight, func.max(ProjectInsight.created_at)),
+                child(ProjectComment, func.count()),
+                child(ProjectComment, func.max(ProjectComment.updated_at)),
+            ).where(CreativeProject.id == project_id)
+        ).first()
+        return tuple(row) if row is not None else None
+
+    @staticmethod
+    def _load_project_with_relations(db: Session, project_id: int) -> Optional[CreativeProject]:
+        # selectinload keeps questions and insights as two flat queries rather
+        # than one join multiplying questions by insights
+        return (
+            db.query(CreativeProject)
+            .options(selectinload(CreativeProject.questions), selectinload(CreativeProject.insights))
+            .filter(CreativeProject.id == project_id)
+            .first()
+        )
+
+    @staticmethod
+    def _load_comments(db: Session, project_id: int) -> List[ProjectComment]:
+        return db.query(ProjectComment).filter(ProjectComment.project_id == project_id).all()
+
+    @staticmethod
+    def _count_timeline(db: Session, project_id: int) -> Tuple[int, int]:
+        # COUNT(*) in the database instead of loading rows just to take len()
+        comments = db.scalar(select(func.count()).where(ProjectComment.project_id == project_id))
+        insights = db.scalar(select(func.count()).where(ProjectInsight.project_id == project_id))
+        return comments, insights
 
     async def _gather_project_context(self, project_id: int, db: Session) -> Optional[Dict[str, Any]]:
         """Gather comprehensive context about a project for AI analysis"""
         
-        project = db.query(CreativeProject).filter(CreativeProject.id == project_id).first()
+        # Check the project's revision first; a recent context for an unchanged
+        # project is reused without loading any related rows
+        revision = await self._run_db(self._load_project_revision, db, project_id)
+        if revision is None:
+            self._context_cache.pop(project_id, None)
+            return None
+        
+        now = time.monotonic()
+        cached = self._context_cache.get(project_id)
+        if cached and cached[1] == revision and now - cached[0] < CONTEXT_CACHE_TTL_SECONDS:
+            return cached[2]
+        
+        project = await self._run_db(self._load_project_with_relations, db, project_id)
         if not project:
+            self._context_cache.pop(project_id, None)
             return None
         
-        # Get related data
-        questions = db.query(ProjectQuestion).filter(ProjectQuestion.project_id == project_id).all()
-        insights = db.query(ProjectInsight).filter(ProjectInsight.project_id == project_id).all()
-        comments = db.query(ProjectComment).filter(ProjectComment.project_id == project_id).all()
+        comments = await self._run_db(self._load_comments, db, project_id)
+        context = self._build_context_from_project(project, project.questions, project.insights, comments)
+        
+        if project_id not in self._context_cache and len(self._context_cache) >= CONTEXT_CACHE_MAX_ENTRIES:
+            self._context_cache.pop(next(iter(self._context_cache)))
+        self._context_cache[project_id] = (now, revision, context)
+        return context
+
+    def _build_context_from_project(self, project: CreativeProject, questions: Sequence[ProjectQuestion] = (),
+                                    insights: Sequence[ProjectInsight] = (),
+                                    comments: Sequence[ProjectComment] = ()) -> Dict[str, Any]:
+        """Build the AI context from already-loaded rows, without touching the database"""
         
         # Answered questions context
-        answered_questions = {}
-        for q in questions:
-            if q.is_answered:
-                answered_questions[q.question] = q.answer
+        answered_questions = {q.question: q.answer for q in questions if q.is_answered}
         
         # Insights summary
-        insights_summary = []
-        for insight in insights:
-            insights_summary.append({
-                "type": insight.insight_type,
-                "title": insight.title,
-                "score": getattr(insight, 'score', insight.confidence)  # Use score if available, otherwise confidence
-            })
+        insights_summary = [
+            {"type": insight.insight_type, "title": insight.title, "score": insight.score}
+            for insight in insights
+        ]
         
         # Team feedback summary
-        team_feedback = []
-        for comment in comments:
-            team_feedback.append({
+        team_feedback = [
+            {
                 "type": comment.comment_type,
                 "content": comment.content[:100] + "..." if len(comment.content) > 100 else comment.content,
                 "resolved": comment.is_resolved
-            })
+            }
+            for comment in comments
+        ]
         
         return {
             "project": {
+                "id": project.id,
                 "name": project.name,
-                "type": project.project_type,
-                "status": getattr(project, 'status', 'draft'),
+                "type": _enum_value(project.project_type),
+                "status": _enum_value(project.status),
                 "description": project.description,
                 "created_at": project.created_at.isoformat(),
                 "dimensions": project.dimensions,
                 "color_palette": project.color_palette,
-                "extracted_text": project.extracted_text[:500] if project.extracted_text else None,
+                "extracted_text": self._prompt_extracted_text(project),
                 "tags": project.tags
             },
             "answered_questions": answered_questions,
             "insights": insights_summary,
-            "team_feedback": team_feedback,
-            "context_generated_at": datetime.utcnow().isoformat()
+            "team_feedback": team_feedback
         }
 
     async def _generate_ai_analysis(self, project_context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive AI analysis"""
         
         analysis_prompt = self._build_analysis_prompt(project_context)
+        messages = [
+            {"role": "system", "content": self.casey_personality["project_analyst"]},
+            {"role": "user", "content": analysis_prompt}
+        ]
+        model = self.models["analysis"]
         
-        response = await openai.ChatCompletion.acreate(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": self.casey_personality["project_analyst"]},
-                {"role": "user", "content": analysis_prompt}
-            ],
-            max_tokens=800,
-            temperature=0.6
-        )
+        analysis_text = None
+        if model not in self._no_structured_output_models:
+            try:
+                analysis_text = await self._call_llm(
+                    messages,
+                    model=model,
+                    cache=True,
+                    max_tokens=800,
+                    temperature=0.6,
+                    response_format=ANALYSIS_RESPONSE_FORMAT
+                )
+            except BadRequestError:
+                # The model does not support json_schema; ask again for prose
+                self._no_structured_output_models.add(model)
+        if analysis_text is None:
+            analysis_text = await self._call_llm(
+                messages, model=model, cache=True, max_tokens=800, temperature=0.6
+            )
         
-        analysis_text = response.choices[0].message.content
+        try:
+            structured = json.loads(analysis_text)
+            return {
+                "summary": str(structured["summary"]),
+                "confidence": min(max(float(structured["confidence"]), 0.0), 1.0),
+                "key_points": [str(point) for point in structured["key_points"]][:5],
+                "recommendations": [str(item) for item in structured["recommendations"]][:4],
+                "mood": self._analyze_casey_mood(project_context),
+                "next_questions": (
+                    [str(q) for q in structured["next_questions"]][:3]
+                    or self._suggest_follow_up_questions(project_context)
+                )
+            }
+        except (ValueError, TypeError, KeyError):
+            # Prose replies from the retry above, or malformed JSON
+            return self._build_analysis_result(analysis_text, project_context)
+
+    def _build_analysis_result(self, analysis_text: str, project_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape raw analysis text into the analysis response"""
         
         # Parse the analysis (simplified - in production, use structured output)
         return {
@@ -257,95 +1078,37 @@ class CaseyAIService:
             "next_questions": self._suggest_follow_up_questions(project_context)
         }
 
-    async def _generate_chat_response(self, project_context: Dict[str, Any], user_message: str) -> str:
+    async def _generate_chat_response(self, project_context: Dict[str, Any], user_message: str,
+                                      conversation_history: Optional[List[Dict[str, str]]] = None) -> str:
         """Generate conversational response"""
         
-        conversation_prompt = self._build_conversation_prompt(project_context, user_message)
-        
-        response = await openai.ChatCompletion.acreate(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": self.casey_personality["conversational"]},
-                {"role": "user", "content": conversation_prompt}
-            ],
+        return await self._call_llm(
+            self._conversation_messages(project_context, user_message, conversation_history),
+            model=self.models["chat"],
             max_tokens=300,
             temperature=0.7
         )
-        
-        return response.choices[0].message.content
 
-    def _load_casey_personality(self) -> Dict[str, str]:
-        """Load Casey's personality prompts for different contexts"""
+    def _conversation_messages(self, project_context: Dict[str, Any], user_message: str,
+                               conversation_history: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+        """Chat messages for a question about a project, after any earlier turns"""
         
-        return {
-            "project_analyst": """You are Casey, an enthusiastic and insightful creative project analyst. 
-            You provide detailed, actionable feedback on creative projects with a focus on design principles, 
-            user experience, and creative impact. You're encouraging but honest, and always suggest specific 
-            improvements. You understand various creative disciplines and current design trends.""",
-            
-            "conversational": """You are Casey, a friendly and knowledgeable creative consultant. 
-            You engage in natural conversation about creative projects, offering insights, suggestions, 
-            and encouragement. You remember project context and can discuss specific details. 
-            You're enthusiastic about creativity and design, and you adapt your communication style 
-            to be helpful and engaging.""",
-            
-            "creative_advisor": """You are Casey, a creative advisor who specializes in generating 
-            innovative suggestions for design improvements. You think outside the box while staying 
-            practical, and you consider current trends, user needs, and project goals when making 
-            recommendations.""",
-            
-            "trend_analyst": """You are Casey, a design trend analyst who stays current with the 
-            latest developments in creative industries. You evaluate projects against contemporary 
-            design movements, emerging technologies, and cultural shifts that influence creative work.""",
-            
-            "storyteller": """You are Casey, a creative storyteller who can weave engaging narratives 
-            about project journeys, team collaborations, and creative processes. You celebrate 
-            milestones, acknowledge challenges, and create compelling project histories."""
-        }
-
-    def _load_analysis_prompts(self) -> Dict[str, str]:
-        """Load structured prompts for different types of analysis"""
-        
-        return {
-            "comprehensive": """Analyze this creative project comprehensively:
-
-Project Details: {project_info}
-User Responses: {answered_questions}
-Current Insights: {insights}
-Team Feedback: {team_feedback}
-
-Please provide:
-1. Overall assessment and strengths
-1. Areas for improvement
-1. Specific actionable recommendations
-1. Creative suggestions for enhancement
-1. Next steps for project completion
-
-Be specific, encouraging, and practical in your feedback.""",
-
-            "conversation": """Continue this conversation about the creative project:
-
-Project Context: {project_info}
-User Message: {user_message}
-
-Respond as Casey - be helpful, specific to this project, and maintain an encouraging but professional tone.
-Reference specific project details when relevant.""",
-
-            "suggestions": """Generate creative suggestions for this {project_type} project focusing on {focus_area}:
-
-Project: {project_name}
-Current Status: {status}
-Available Details: {project_details}
-
-Provide 5-8 specific, actionable suggestions that would improve the project."""
-        }
+        return [
+            {"role": "system", "content": self.casey_personality["conversational"]},
+            *(conversation_history or ()),
+            {"role": "user", "content": self._build_conversation_prompt(project_context, user_message)}
+        ]
 
     def _build_analysis_prompt(self, project_context: Dict[str, Any]) -> str:
         """Build comprehensive analysis prompt"""
         
         project = project_context["project"]
         
-        prompt = f"""Analyze this {project['type']} project: "{project['name']}"
+        # Invariant instructions first and deterministic JSON, so repeated
+        # requests share the longest possible prompt prefix
+        prompt = f"""Please provide a comprehensive analysis with specific recommendations for the project below.
+
+PROJECT: "{project['name']}"
 
 PROJECT DETAILS:
 - Type: {project['type']}
@@ -356,40 +1119,89 @@ PROJECT DETAILS:
 - Text Content: {"Available" if project.get('extracted_text') else "None"}
 
 ANSWERED QUESTIONS:
-{json.dumps(project_context.get('answered_questions', {}), indent=2)}
+{_stable_json(self._prompt_answered_questions(project_context.get('answered_questions', {})))}
 
 CURRENT INSIGHTS:
-{json.dumps(project_context.get('insights', []), indent=2)}
+{_stable_json(project_context.get('insights', []))}
 
 TEAM FEEDBACK:
-{len(project_context.get('team_feedback', []))} comments/feedback items
-
-Please provide a comprehensive analysis with specific recommendations."""
+{len(project_context.get('team_feedback', []))} comments/feedback items"""
 
         return prompt
 
+    def _prompt_answered_questions(self, answered_questions: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep answered questions, in order, until the prompt budget is spent"""
+        
+        kept = {}
+        used = 2  # surrounding braces
+        for question, answer in answered_questions.items():
+            used += len(_stable_json({question: answer})) - 1
+            if used > ANSWERED_QUESTIONS_PROMPT_CHARS:
+                break
+            kept[question] = answer
+        return kept
+
+    def _prompt_extracted_text(self, project: CreativeProject) -> Optional[str]:
+        """Stored summary of the extracted text when current, else a short excerpt"""
+        
+        text = project.extracted_text
+        if not text:
+            return None
+        if len(text) > EXTRACTED_TEXT_PROMPT_CHARS:
+            metadata = project.project_metadata or {}
+            summary = metadata.get("text_summary")
+            if summary and metadata.get("text_summary_source") == hashlib.sha256(text.encode("utf-8")).hexdigest():
+                return summary
+        return text[:EXTRACTED_TEXT_PROMPT_CHARS]
+
+    def _design_fingerprint(self, project: CreativeProject, focus_area: str) -> str:
+        """Hash the design features suggestions depend on, ignoring the project's identity"""
+        
+        features = {
+            "type": _enum_value(project.project_type),
+            "status": _enum_value(project.status),
+            "color_palette": project.color_palette,
+            "dimensions": project.dimensions,
+            "tags": project.tags,
+            "focus_area": focus_area
+        }
+        return hashlib.sha256(_stable_json(features).encode("utf-8")).hexdigest()
+
+    def _build_bulk_analysis_prompt(self, contexts: Dict[int, Dict[str, Any]]) -> str:
+        """Build one prompt covering several projects"""
+        
+        sections = "\n\n".join(
+            f"=== PROJECT ID {project_id} ===\n{self._build_analysis_prompt(project_context)}"
+            for project_id, project_context in contexts.items()
+        )
+        return f"""Analyze each project below. Reply with a JSON object of the form {{"analyses": [{{"id": <project id>, "analysis": "<analysis text>"}}]}} containing one entry per project.
+
+{sections}"""
+
     def _build_conversation_prompt(self, project_context: Dict[str, Any], user_message: str) -> str:
         """Build conversation prompt"""
         
         project = project_context["project"]
         
-        return f"""User is asking about their {project['type']} project "{project['name']}":
-
-User Message: {user_message}
+        # The user message goes last so turns about one project share a prefix
+        return f"""Respond as Casey with specific, helpful advice about the user's project.
 
+Project: {project['type']} project "{project['name']}"
 Project Status: {project['status']}
-Key Details: {json.dumps({k: v for k, v in project.items() if k in ['dimensions', 'color_palette', 'tags']}, indent=2)}
+Key Details: {_stable_json({k: v for k, v in project.items() if k in ['dimensions', 'color_palette', 'tags']})}
 
-Respond as Casey with specific, helpful advice about their project."""
+User Message: {user_message}"""
 
     def _build_suggestions_prompt(self, project: CreativeProject, focus_area: str) -> str:
         """Build suggestions prompt"""
         
-        return f"""Generate creative suggestions for this {project.project_type} project focusing on {focus_area}:
+        # Only the fingerprinted design features go in the prompt, so the reply
+        # fits every project that shares it
+        project_type = _enum_value(project.project_type)
+        return f"""Generate creative suggestions for this {project_type} project focusing on {focus_area}:
 
-Project: {project.name}
-Status: {getattr(project, 'status', 'draft')}
-Type: {project.project_type}
+Status: {_enum_value(project.status)}
+Type: {project_type}
 Colors: {project.color_palette or 'Not analyzed'}
 Dimensions: {project.dimensions or 'Not available'}
 
@@ -398,10 +1210,11 @@ Provide specific, actionable suggestions formatted as a bullet list."""
     def _build_trends_prompt(self, project: CreativeProject) -> str:
         """Build trends analysis prompt"""
         
-        return f"""Evaluate this {project.project_type} project against current design trends:
+        project_type = _enum_value(project.project_type)
+        return f"""Evaluate this {project_type} project against current design trends:
 
 Project: {project.name}
-Type: {project.project_type}
+Type: {project_type}
 Created: {project.created_at.year}
 
 Consider:
@@ -432,22 +1245,10 @@ Tell the story of this project's development in an inspiring, narrative style.""
         return {
             "summary": f"I'm excited to analyze your creative project! While my advanced AI analysis is {reason.lower()}, I can still provide valuable insights based on the project data I've collected.",
             "confidence": 0.6,
-            "key_points": [
-                "Project successfully uploaded and processed",
-                "Basic technical analysis completed",
-                "Ready for team collaboration and feedback"
-            ],
-            "recommendations": [
-                "Share with team members for feedback",
-                "Review technical specifications for your target platform",
-                "Consider accessibility and user experience factors"
-            ],
+            "key_points": list(FALLBACK_KEY_POINTS),
+            "recommendations": list(FALLBACK_RECOMMENDATIONS),
             "mood": "enthusiastic",
-            "next_questions": [
-                "What specific aspect would you like me to focus on?",
-                "Are there any particular design goals you're trying to achieve?",
-                "Would you like suggestions for improvement in any area?"
-            ],
+            "next_questions": list(FALLBACK_NEXT_QUESTIONS),
             "note": f"Advanced AI analysis temporarily unavailable: {reason}"
         }
 
@@ -455,69 +1256,36 @@ Tell the story of this project's development in an inspiring, narrative style.""
         """Provide fallback chat response"""
         
         message_lower = user_message.lower()
+        project_type = _enum_value(project.project_type)
         
         if "color" in message_lower:
             if project.color_palette:
-                return f"I can see your {project.project_type} uses {len(project.color_palette)} main colors. The palette includes {', '.join(project.color_palette[:3])}. What would you like to know about your color choices?"
+                return f"I can see your {project_type} uses {len(project.color_palette)} main colors. The palette includes {', '.join(project.color_palette[:3])}. What would you like to know about your color choices?"
             else:
                 return "I'd love to discuss colors with you! Once I analyze your project's color palette, I can provide specific feedback about color harmony, psychology, and effectiveness."
         
         elif "improve" in message_lower or "better" in message_lower:
-            return f"Great question! For {project.project_type.replace('_', ' ')} projects like yours, I typically recommend focusing on visual hierarchy, color consistency, and platform optimization. What specific area would you like to improve?"
+            return f"Great question! For {project_type.replace('_', ' ')} projects like yours, I typically recommend focusing on visual hierarchy, color consistency, and platform optimization. What specific area would you like to improve?"
         
         elif "feedback" in message_lower or "opinion" in message_lower:
-            return f"I'm excited to give you feedback on '{project.name}'! Based on what I can see, this is a {project.project_type.replace('_', ' ')} project. Could you tell me what specific feedback you're looking for?"
+            return f"I'm excited to give you feedback on '{project.name}'! Based on what I can see, this is a {project_type.replace('_', ' ')} project. Could you tell me what specific feedback you're looking for?"
         
         else:
-            return f"That's a great question about your {project.project_type.replace('_', ' ')} project '{project.name}'. I'm here to help with design feedback, creative suggestions, and technical guidance. What specific aspect would you like to explore together?"
+            return f"That's a great question about your {project_type.replace('_', ' ')} project '{project.name}'. I'm here to help with design feedback, creative suggestions, and technical guidance. What specific aspect would you like to explore together?"
 
     def _fallback_suggestions(self, project: CreativeProject, focus_area: str) -> List[str]:
         """Provide fallback suggestions"""
         
-        base_suggestions = {
-            "website_mockup": [
-                "Ensure responsive design across all device sizes",
-                "Optimize loading times and performance",
-                "Implement clear visual hierarchy with typography",
-                "Add accessibility features (alt text, contrast)",
-                "Consider user flow and navigation patterns"
-            ],
-            "social_media": [
-                "Optimize dimensions for target platform",
-                "Use high-contrast colors for mobile viewing",
-                "Keep text large and readable on small screens",
-                "Include clear call-to-action elements",
-                "Test across different social media formats"
-            ],
-            "print_graphic": [
-                "Verify color mode (CMYK for printing)",
-                "Add proper bleed and margin areas",
-                "Check resolution for print quality (300 DPI)",
-                "Consider paper type and finish effects",
-                "Review typography for print legibility"
-            ]
-        }
-        
-        return base_suggestions.get(project.project_type, [
-            "Focus on clear visual hierarchy",
-            "Ensure consistent branding elements",
-            "Optimize for your target audience",
-            "Consider accessibility requirements",
-            "Test across relevant platforms/devices"
-        ])
+        return list(FALLBACK_SUGGESTIONS.get(_enum_value(project.project_type), DEFAULT_FALLBACK_SUGGESTIONS))
 
     def _fallback_trends_analysis(self, project: CreativeProject) -> Dict[str, Any]:
         """Provide fallback trends analysis"""
         
         return {
-            "analysis": f"Your {project.project_type.replace('_', ' ')} project aligns with several current design trends. The minimalist approach and focus on user experience are very contemporary.",
+            "analysis": f"Your {_enum_value(project.project_type).replace('_', ' ')} project aligns with several current design trends. The minimalist approach and focus on user experience are very contemporary.",
             "trend_alignment_score": 0.7,
-            "trending_elements": ["clean layouts", "bold typography", "accessibility focus"],
-            "recommendations": [
-                "Consider incorporating sustainable design principles",
-                "Explore micro-interactions for engagement",
-                "Review current accessibility standards"
-            ]
+            "trending_elements": list(FALLBACK_TRENDING_ELEMENTS),
+            "recommendations": list(FALLBACK_TREND_RECOMMENDATIONS)
         }
 
     def _fallback_story(self, story_context: Dict[str, Any]) -> str:
@@ -537,32 +1305,30 @@ This represents more than just a creative work—it's a testament to the iterati
         """Extract key points from AI analysis"""
         
         # Simple extraction - in production, use more sophisticated parsing
-        lines = analysis_text.split('\n')
         key_points = []
-        
-        for line in lines:
-            if line.strip() and ('•' in line or '-' in line or line.strip().endswith(':')):
-                cleaned = line.strip().lstrip('•-*').strip()
-                if cleaned and len(cleaned) > 10:
+        for line in analysis_text.split('\n'):
+            stripped = line.strip()
+            if stripped and ('•' in line or '-' in line or stripped.endswith(':')):
+                cleaned = stripped.lstrip('•-*').strip()
+                if len(cleaned) > 10:
                     key_points.append(cleaned)
-        
-        return key_points[:5]  # Limit to 5 key points
+                    if len(key_points) == 5:  # Limit to 5 key points
+                        break
+        return key_points
 
     def _extract_recommendations(self, analysis_text: str) -> List[str]:
         """Extract recommendations from AI analysis"""
         
         # Look for recommendation-like statements
-        lines = analysis_text.split('.')
         recommendations = []
+        for match in RECOMMENDATION_RE.finditer(analysis_text):
+            sentence = match.group().strip()
+            if len(sentence) > 20:
+                recommendations.append(sentence)
+                if len(recommendations) == 4:  # Limit to 4 recommendations
+                    break
         
-        trigger_words = ['recommend', 'suggest', 'consider', 'should', 'could', 'try']
-        
-        for line in lines:
-            line = line.strip()
-            if any(word in line.lower() for word in trigger_words) and len(line) > 20:
-                recommendations.append(line)
-        
-        return recommendations[:4]  # Limit to 4 recommendations
+        return recommendations
 
     def _analyze_casey_mood(self, project_context: Dict[str, Any]) -> str:
         """Determine Casey's mood based on project state"""
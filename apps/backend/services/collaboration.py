@@ -2,19 +2,113 @@
 Collaboration service for managing team interactions and real-time features.
 """
 import asyncio
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-
-from .models import CreativeProject
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import desc, lambda_stmt, select, tuple_, type_coerce
+
+from .models import CreativeProject, ProjectActivity, ProjectComment, TeamMember
+
+
+# Type-specific annotation metadata: (metadata key, kwarg name) pairs
+ANNOTATION_FIELDS = MappingProxyType({
+    "design_suggestion": (("suggestion_category", "category"), ("priority", "priority")),
+    "approval": (("approval_status", "status"), ("approval_level", "level")),
+    "issue": (("issue_severity", "severity"), ("issue_category", "category")),
+})
+
+
+def _comment_list_select():
+    """Columns serialized for comment lists, with author and resolver names."""
+    # Select only the serialized columns; rows skip ORM instance
+    # construction and identity-map bookkeeping
+    author = aliased(TeamMember)
+    resolver = aliased(TeamMember)
+    return select(
+        ProjectComment.id,
+        ProjectComment.content,
+        ProjectComment.comment_type,
+        ProjectComment.author_id,
+        author.name.label("author_name"),
+        ProjectComment.is_resolved,
+        ProjectComment.resolved_by,
+        resolver.name.label("resolved_by_name"),
+        ProjectComment.created_at,
+        ProjectComment.comment_metadata.label("metadata")
+    ).outerjoin(
+        author, ProjectComment.author_id == author.id
+    ).outerjoin(
+        resolver, ProjectComment.resolved_by == resolver.id
+    )
+
+
+def _activity_list_select():
+    """Columns serialized for activity lists."""
+    return select(
+        ProjectActivity.id,
+        ProjectActivity.activity_type,
+        ProjectActivity.description,
+        ProjectActivity.user_id,
+        ProjectActivity.created_at,
+        ProjectActivity.activity_metadata.label("metadata")
+    )
 
 
 class CollaborationService:
     """Service for handling collaboration features."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, session_factory: Optional[Callable[[], Session]] = None):
         self.db = db
+        # Opens extra sessions for reads that run concurrently with ``db``
+        self.session_factory = session_factory
+
+    async def _run_db(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking Session work in a worker thread so the event loop stays free.
+
+        Calls are awaited one at a time; a Session must never be used from two
+        threads at once.
+        """
+        return await asyncio.to_thread(fn, *args)
+
+    def _save_comment(self, comment: ProjectComment, description: str) -> Dict[str, Any]:
+        """Insert a comment and its activity row in one transaction."""
+        self.db.add(comment)
+        self.db.flush()  # assigns comment.id and created_at
+        # Serialize before commit expires the instance, so no refresh SELECT is needed
+        saved = {
+            "id": comment.id,
+            "content": comment.content,
+            "comment_type": comment.comment_type,
+            "author_id": comment.author_id,
+            "created_at": comment.created_at.isoformat(),
+            "metadata": comment.comment_metadata
+        }
+        self.db.add(self._build_activity(
+            project_id=comment.project_id,
+            user_id=comment.author_id,
+            activity_type="comment",
+            description=description,
+            metadata={"comment_id": comment.id}
+        ))
+        self.db.commit()
+        return saved
+
+    @staticmethod
+    def _build_activity(
+        project_id: int,
+        user_id: int,
+        activity_type: str,
+        description: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> ProjectActivity:
+        return ProjectActivity(
+            project_id=project_id,
+            user_id=user_id,
+            activity_type=activity_type,
+            description=description,
+            activity_metadata=metadata or {}
+        )
 
     async def add_comment(
         self,
@@ -32,41 +126,22 @@ class CollaborationService:
                 author_id=author_id,
                 content=content,
                 comment_type=comment_type,
-                metadata=metadata or {}
-            )
-
-            self.db.add(comment)
-            self.db.commit()
-            self.db.refresh(comment)
-
-            # Log activity
-            await self.log_activity(
-                project_id=project_id,
-                user_id=author_id,
-                activity_type="comment",
-                description=f"Added comment: {content[:50]}...",
-                metadata={"comment_id": comment.id}
+                comment_metadata=metadata or {}
             )
 
-            return {
-                "id": comment.id,
-                "content": comment.content,
-                "comment_type": comment.comment_type,
-                "author_id": comment.author_id,
-                "created_at": comment.created_at.isoformat(),
-                "metadata": comment.metadata
-            }
+            # The activity row shares the comment's commit
+            return await self._run_db(self._save_comment, comment, f"Added comment: {content[:50]}...")
 
         except Exception as e:
-            self.db.rollback()
+            await self._run_db(self.db.rollback)
             raise e
 
     async def resolve_comment(self, comment_id: int, resolved_by: int) -> bool:
         """Mark a comment as resolved."""
         try:
-            comment = self.db.query(ProjectComment).filter(
-                ProjectComment.id == comment_id
-            ).first()
+            comment = await self._run_db(
+                self.db.query(ProjectComment).filter(ProjectComment.id == comment_id).first
+            )
 
             if not comment:
                 return False
@@ -75,21 +150,20 @@ class CollaborationService:
             comment.resolved_by = resolved_by
             comment.resolved_at = datetime.utcnow()
 
-            self.db.commit()
-
-            # Log activity
-            await self.log_activity(
+            # Log activity in the same commit as the resolution
+            self.db.add(self._build_activity(
                 project_id=comment.project_id,
                 user_id=resolved_by,
                 activity_type="resolve_comment",
                 description=f"Resolved comment: {comment.content[:50]}...",
                 metadata={"comment_id": comment_id}
-            )
+            ))
+            await self._run_db(self.db.commit)
 
             return True
 
         except Exception as e:
-            self.db.rollback()
+            await self._run_db(self.db.rollback)
             raise e
 
     async def get_project_comments(
@@ -99,27 +173,28 @@ class CollaborationService:
         limit: int = 50
     ) -> List[Dict[str, Any]]:
         """Get comments for a project."""
-        query = self.db.query(ProjectComment).filter(
-            ProjectComment.project_id == project_id
-        )
+        return await self._run_db(self._fetch_comments, self.db, project_id, include_resolved, limit)
+
+    @staticmethod
+    def _fetch_comments(
+        db: Session,
+        project_id: int,
+        include_resolved: bool,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        # lambda_stmt caches the compiled SQL by code location; project_id and
+        # limit become bound parameters instead of triggering a recompile
+        stmt = lambda_stmt(lambda: _comment_list_select().where(ProjectComment.project_id == project_id))
 
         if not include_resolved:
-            query = query.filter(ProjectComment.is_resolved == False)
+            stmt += lambda s: s.where(ProjectComment.is_resolved == 0)
 
-        comments = query.order_by(desc(ProjectComment.created_at)).limit(limit).all()
+        stmt += lambda s: s.order_by(desc(ProjectComment.created_at)).limit(limit)
+        rows = db.execute(stmt)
 
         return [
-            {
-                "id": comment.id,
-                "content": comment.content,
-                "comment_type": comment.comment_type,
-                "author_id": comment.author_id,
-                "is_resolved": comment.is_resolved,
-                "resolved_by": comment.resolved_by,
-                "created_at": comment.created_at.isoformat(),
-                "metadata": comment.metadata
-            }
-            for comment in comments
+            {**row._mapping, "created_at": row.created_at.isoformat()}
+            for row in rows
         ]
 
     async def log_activity(
@@ -132,19 +207,13 @@ class CollaborationService:
     ):
         """Log project activity."""
         try:
-            activity = ProjectActivity(
-                project_id=project_id,
-                user_id=user_id,
-                activity_type=activity_type,
-                description=description,
-                metadata=metadata or {}
-            )
+            activity = self._build_activity(project_id, user_id, activity_type, description, metadata)
 
             self.db.add(activity)
-            self.db.commit()
+            await self._run_db(self.db.commit)
 
         except Exception as e:
-            self.db.rollback()
+            await self._run_db(self.db.rollback)
             # Don't raise exception for activity logging to avoid breaking main flows
             print(f"Failed to log activity: {e}")
 
@@ -152,30 +221,116 @@ class CollaborationService:
         self,
         project_id: int,
         activity_types: Optional[List[str]] = None,
-        limit: int = 100
+        limit: int = 100,
+        before_created_at: Optional[Union[datetime, str]] = None,
+        before_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get recent activities for a project."""
-        query = self.db.query(ProjectActivity).filter(
-            ProjectActivity.project_id == project_id
+        """Get recent activities for a project.
+
+        ``before_created_at`` (a datetime or ISO 8601 string) and ``before_id``,
+        given together, return only activities older than that position in the feed.
+        """
+        if (before_created_at is None) != (before_id is None):
+            raise ValueError("before_created_at and before_id must be given together")
+        if isinstance(before_created_at, str):
+            try:
+                before_created_at = datetime.fromisoformat(before_created_at)
+            except ValueError:
+                raise ValueError(f"Invalid before_created_at cursor: {before_created_at!r}") from None
+        return await self._run_db(
+            self._fetch_activities, self.db, project_id, activity_types, limit,
+            before_created_at, before_id
+        )
+
+    async def get_project_activity_page(
+        self,
+        project_id: int,
+        activity_types: Optional[List[str]] = None,
+        limit: int = 100,
+        before_created_at: Optional[Union[datetime, str]] = None,
+        before_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get one page of a project's activity feed with a cursor for the next.
+
+        ``next_cursor`` holds the ``before_created_at`` (ISO string) and
+        ``before_id`` to request the following page, or is None on the last page.
+        """
+        activities = await self.get_project_activities(
+            project_id, activity_types, limit, before_created_at, before_id
         )
+        next_cursor = None
+        if len(activities) == limit:
+            last = activities[-1]
+            next_cursor = {"before_created_at": last["created_at"], "before_id": last["id"]}
+        return {"activities": activities, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _fetch_activities(
+        db: Session,
+        project_id: int,
+        activity_types: Optional[List[str]],
+        limit: int,
+        before_created_at: Optional[datetime] = None,
+        before_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        stmt = lambda_stmt(lambda: _activity_list_select().where(ProjectActivity.project_id == project_id))
 
         if activity_types:
-            query = query.filter(ProjectActivity.activity_type.in_(activity_types))
+            stmt += lambda s: s.where(ProjectActivity.activity_type.in_(activity_types))
+
+        # Keyset pagination: each page seeks past the previous page's last
+        # (created_at, id) instead of scanning and discarding an OFFSET. The
+        # cursor values are bound with the column types so the driver stores
+        # and compares them in the same format as the rows
+        if before_created_at is not None:
+            stmt += lambda s: s.where(
+                tuple_(ProjectActivity.created_at, ProjectActivity.id) < tuple_(
+                    type_coerce(before_created_at, ProjectActivity.created_at.type),
+                    type_coerce(before_id, ProjectActivity.id.type),
+                )
+            )
 
-        activities = query.order_by(desc(ProjectActivity.created_at)).limit(limit).all()
+        stmt += lambda s: s.order_by(
+            desc(ProjectActivity.created_at), desc(ProjectActivity.id)
+        ).limit(limit)
+        rows = db.execute(stmt)
 
         return [
-            {
-                "id": activity.id,
-                "activity_type": activity.activity_type,
-                "description": activity.description,
-                "user_id": activity.user_id,
-                "created_at": activity.created_at.isoformat(),
-                "metadata": activity.metadata
-            }
-            for activity in activities
+            {**row._mapping, "created_at": row.created_at.isoformat()}
+            for row in rows
         ]
 
+    async def get_project_feed(
+        self,
+        project_id: int,
+        include_resolved: bool = False,
+        comment_limit: int = 50,
+        activity_limit: int = 100
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get a project's comments and recent activities together.
+
+        With a session factory the two queries run concurrently, each on its
+        own session; otherwise they run one after the other on ``self.db``.
+        """
+        if self.session_factory is None:
+            comments = await self.get_project_comments(project_id, include_resolved, comment_limit)
+            activities = await self.get_project_activities(project_id, limit=activity_limit)
+        else:
+            comments, activities = await asyncio.gather(
+                self._run_db(self._with_session, self._fetch_comments,
+                             project_id, include_resolved, comment_limit),
+                self._run_db(self._with_session, self._fetch_activities,
+                             project_id, None, activity_limit)
+            )
+        return {"comments": comments, "activities": activities}
+
+    def _with_session(self, fetch: Callable[..., Any], *args: Any) -> Any:
+        db = self.session_factory()
+        try:
+            return fetch(db, *args)
+        finally:
+            db.close()
+
     async def add_team_member(
         self,
         project_id: int,
@@ -221,28 +376,54 @@ class RealTimeCollaboration:
             "image_height": image_height,
         }
 
+    @staticmethod
+    def generate_visual_comment_coordinates_batch(
+        xs: Sequence[float], ys: Sequence[float], image_width: int, image_height: int
+    ) -> Dict[str, Any]:
+        """Convert many points on one image to percentages in a single pass.
+
+        Returns columns rather than one dict per point, matching the keys of
+        ``generate_visual_comment_coordinates``. Every column is a new list of
+        floats, so the result is JSON-serializable and never aliases the
+        caller's sequences. Raises ValueError if ``xs`` and ``ys`` differ in length.
+        """
+        if len(xs) != len(ys):
+            raise ValueError(f"xs and ys must have the same length, got {len(xs)} and {len(ys)}")
+        x_scale = 100.0 / image_width if image_width else 0.0
+        y_scale = 100.0 / image_height if image_height else 0.0
+        x_absolute, y_absolute = [float(x) for x in xs], [float(y) for y in ys]
+        x_percent = [x * x_scale for x in x_absolute]
+        y_percent = [y * y_scale for y in y_absolute]
+        return {
+            "x_percent": x_percent,
+            "y_percent": y_percent,
+            "x_absolute": x_absolute,
+            "y_absolute": y_absolute,
+            "image_width": image_width,
+            "image_height": image_height,
+        }
+
     @staticmethod
     def create_annotation_metadata(
         annotation_type: str,
         coordinates: Optional[Dict[str, float]] = None,
+        *,
+        timestamp: Optional[str] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
-        """Create structured metadata for project annotations."""
+        """Create structured metadata for project annotations.
+
+        Callers building many annotations at once can pass a precomputed
+        ``timestamp`` so the clock is read once per batch.
+        """
         metadata: Dict[str, Any] = {
             "annotation_type": annotation_type,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
         }
         if coordinates:
             metadata["coordinates"] = coordinates
 
-        if annotation_type == "design_suggestion":
-            metadata["suggestion_category"] = kwargs.get("category")
-            metadata["priority"] = kwargs.get("priority")
-        elif annotation_type == "approval":
-            metadata["approval_status"] = kwargs.get("status")
-            metadata["approval_level"] = kwargs.get("level")
-        elif annotation_type == "issue":
-            metadata["issue_severity"] = kwargs.get("severity")
-            metadata["issue_category"] = kwargs.get("category")
+        for key, kwarg in ANNOTATION_FIELDS.get(annotation_type, ()):
+            metadata[key] = kwargs.get(kwarg)
 
         return metadata
@@ -178,6 +178,8 @@ class CreativeProject(Base):
     questions = relationship("ProjectQuestion", back_populates="project", cascade="all, delete-orphan")
     files = relationship("ProjectFile", back_populates="project", cascade="all, delete-orphan")
     insights = relationship("ProjectInsight", back_populates="project", cascade="all, delete-orphan")
+    comments = relationship("ProjectComment", back_populates="project", cascade="all, delete-orphan")
+    activities = relationship("ProjectActivity", back_populates="project", cascade="all, delete-orphan")
 
 
 class ProjectQuestion(Base):
@@ -235,6 +237,85 @@ class ProjectInsight(Base):
     project = relationship("CreativeProject", back_populates="insights")
 
 
+class TeamMember(Base):
+    """People who comment on and work on creative projects."""
+
+    __tablename__ = "team_members"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(255), nullable=False)
+    email = Column(String(255), unique=True, nullable=False)
+    role = Column(String(100), nullable=True)
+    avatar_url = Column(String(500), nullable=True)
+    is_active = Column(Integer, default=1)
+    permissions = Column(JSON, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    comments = relationship("ProjectComment", foreign_keys="ProjectComment.author_id", back_populates="author")
+    activities = relationship("ProjectActivity", back_populates="user")
+
+
+class ProjectComment(Base):
+    """Team comments on a creative project."""
+
+    __tablename__ = "project_comments"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(Integer, ForeignKey("creative_projects.id"), nullable=False)
+    author_id = Column(Integer, ForeignKey("team_members.id"), nullable=False)
+    content = Column(Text, nullable=False)
+    comment_type = Column(String(50), default="general")
+    comment_metadata = Column("metadata", JSON, default=dict)
+    is_resolved = Column(Integer, default=0)
+    resolved_by = Column(Integer, ForeignKey("team_members.id"), nullable=True)
+    resolved_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    project = relationship("CreativeProject", back_populates="comments")
+    author = relationship("TeamMember", foreign_keys=[author_id], back_populates="comments")
+
+
+class ProjectActivity(Base):
+    """Activity feed entries for a creative project."""
+
+    __tablename__ = "project_activities"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(Integer, ForeignKey("creative_projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("team_members.id"), nullable=False)
+    activity_type = Column(String(100), nullable=False)
+    description = Column(Text, nullable=True)
+    activity_metadata = Column("metadata", JSON, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    project = relationship("CreativeProject", back_populates="activities")
+    user = relationship("TeamMember", back_populates="activities")
+
+
+# Comment lists filter by project and read newest first; the partial index
+# serves the default unresolved-only listing
+Index(
+    "ix_project_comments_project_created",
+    ProjectComment.project_id,
+    ProjectComment.created_at.desc(),
+)
+Index(
+    "ix_project_comments_open_project_created",
+    ProjectComment.project_id,
+    ProjectComment.created_at.desc(),
+    postgresql_where=ProjectComment.is_resolved == 0,
+    sqlite_where=ProjectComment.is_resolved == 0,
+)
+# The id column breaks created_at ties for keyset pagination of the feed
+Index(
+    "ix_project_activities_project_created",
+    ProjectActivity.project_id,
+    ProjectActivity.created_at.desc(),
+    ProjectActivity.id.desc(),
+)
+
+
 # Association tables --------------------------------------------------------
 
 project_skills = Table(
@@ -1,7 +1,16 @@
 """Test configuration to handle async test functions without external plugins."""
 
 import inspect
+import sys
+from pathlib import Path
+
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root / "apps"))
+sys.path.append(str(project_root / "packages"))
 
 
 def pytest_collection_modifyitems(config, items):
@@ -21,3 +30,23 @@ def pytest_pyfunc_call(pyfuncitem):
 
         asyncio.run(test_func(**pyfuncitem.funcargs))
         return True
+
+
+@pytest.fixture
+def anyio_backend():
+    # Async tests run under asyncio.run, and the services offload queries
+    # with asyncio.to_thread
+    return "asyncio"
+
+
+@pytest.fixture
+def sqlite_engine():
+    """In-memory SQLite with the service tables, shared with the worker threads services query from."""
+    from backend.services.models import Base
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
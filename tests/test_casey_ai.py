@@ -0,0 +1,168 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root / "apps"))
+sys.path.append(str(project_root / "packages"))
+
+from backend.services.casey_ai import AdvancedCaseyAI
+
+
+def test_extract_entities():
+    casey = AdvancedCaseyAI()
+    entities = casey._extract_entities(
+        "The Design team and the manager use Salesforce daily; approval takes 2 days."
+    )
+    assert "manager" in entities["actors"]
+    assert "design team" in entities["actors"]
+    assert "salesforce" in entities["tools"]
+    assert "daily" in entities["timeframes"]
+    assert "2 days" in entities["metrics"]
+
+
+def test_extract_process_elements():
+    casey = AdvancedCaseyAI()
+    elements = casey._extract_process_elements(
+        "First we submit the form. If it is complete, approve it. Then send to finance."
+    )
+    assert elements["steps"]
+    assert any(d.startswith("If it is complete") for d in elements["decisions"])
+    assert any(h.startswith("send to finance") for h in elements["handoffs"])
+
+
+def test_analyze_conversation_turn_generates_insights():
+    casey = AdvancedCaseyAI()
+    result = casey.analyze_conversation_turn(
+        "Invoice approval is slow and manual, and we keep making errors."
+    )
+    analysis = result["analysis"]
+    assert analysis["domain"] == "finance"
+    assert {"delay", "manual_work", "errors"} <= set(analysis["pain_points"])
+
+    titles = [insight.title for insight in result["insights"]]
+    assert "Automation Opportunity Detected" in titles
+    assert "Bottleneck Risk Identified" in titles
+    assert "Quality Improvement Opportunity" in titles
+    assert result["context"].domain == "finance"
+
+
+def test_scan_keywords_reports_overlapping_matches():
+    from backend.services.casey_ai import scan_keywords
+
+    hits = scan_keywords("this is better than the old process")
+    assert {"better", "better than", "process"} <= hits
+    assert "invoice" not in hits
+
+
+def test_scan_caches_hold_only_short_texts():
+    from backend.services.casey_ai import (
+        SCAN_CACHE_MAX_CHARS,
+        _scan_keywords_cached,
+        scan_keywords,
+    )
+
+    _scan_keywords_cached.cache_clear()
+    long_text = "better process " * SCAN_CACHE_MAX_CHARS
+    assert {"better", "process"} <= scan_keywords(long_text)
+    assert _scan_keywords_cached.cache_info().currsize == 0
+
+    scan_keywords("a better process")
+    scan_keywords("a better process")
+    assert _scan_keywords_cached.cache_info().hits == 1
+
+
+def test_discovery_response_rotates_questions():
+    from backend.services.casey_ai import DISCOVERY_QUESTIONS, ConversationContext
+
+    casey = AdvancedCaseyAI()
+    analysis = {"entities": {"actors": ["manager"], "tools": ["excel"], "timeframes": ["daily"]}}
+    context = ConversationContext()
+    asked = [
+        casey._generate_discovery_response(analysis, context)
+        for _ in range(len(DISCOVERY_QUESTIONS) + 1)
+    ]
+    assert asked[:-1] == list(DISCOVERY_QUESTIONS)
+    assert asked[-1] == DISCOVERY_QUESTIONS[0]
+
+    # Each conversation starts from the first question
+    assert casey._generate_discovery_response(analysis, ConversationContext()) == DISCOVERY_QUESTIONS[0]
+
+
+def test_conversation_profiles_evict_least_recently_used():
+    from backend.services.casey_ai import ConversationProfiles
+
+    profiles = ConversationProfiles(max_conversations=2)
+    first = profiles["a"]
+    profiles["b"].domain = "finance"
+    assert profiles["a"] is first  # refreshes "a"
+    profiles["c"]
+
+    assert list(profiles) == ["a", "c"]
+    assert profiles["b"].domain == "general"  # recreated after eviction
+
+
+def test_smart_response_dispatches_on_intent():
+    casey = AdvancedCaseyAI()
+    result = casey.analyze_conversation_turn("We have a problem: approvals are slow.")
+    response = casey._generate_smart_response(result["analysis"], result["context"], result["insights"])
+    assert response.startswith("I can help solve this!")
+
+
+def test_learning_data_keeps_most_recent_turns():
+    from backend.services.casey_ai import MAX_LEARNING_ENTRIES
+
+    casey = AdvancedCaseyAI()
+    for turn in range(MAX_LEARNING_ENTRIES + 5):
+        casey._update_learning(f"turn {turn}", {}, "conv")
+
+    history = casey.learning_data["conv"]
+    assert len(history) == MAX_LEARNING_ENTRIES
+    assert history[0]["input"] == "turn 5"
+    assert history[-1]["input"] == f"turn {MAX_LEARNING_ENTRIES + 4}"
+
+
+def test_learning_data_is_evicted_with_conversation_profiles():
+    casey = AdvancedCaseyAI()
+    casey.user_profiles.max_conversations = 2
+    for conversation_id in ("a", "b", "c"):
+        casey._update_learning("hello", {}, conversation_id)
+
+    assert list(casey.user_profiles) == ["b", "c"]
+    assert set(casey.learning_data) == {"b", "c"}
+
+
+def test_learning_snapshots_are_frozen_and_shared_when_unchanged():
+    casey = AdvancedCaseyAI()
+    casey.analyze_conversation_turn("Invoice approval is slow.", "conv")
+    casey.analyze_conversation_turn("Invoice approval is slow.", "conv")
+    casey.analyze_conversation_turn("And the data entry is manual.", "conv")
+
+    first, second, third = (entry["context"] for entry in casey.learning_data["conv"])
+    assert first is second
+    assert first["pain_points"] == ("delay",)
+    assert third["pain_points"] == ("delay", "manual_work")
+
+
+def test_classifier_and_optimizer_share_step_scan():
+    from backend.services.casey_ai import (
+        ProcessClassifier,
+        ProcessOptimizationEngine,
+        scan_steps,
+    )
+
+    elements = {"steps": ["Review the form", "Enter totals manually"], "decisions": []}
+    step_hits = scan_steps(elements["steps"])
+
+    assert ProcessClassifier().classify(elements, step_hits) == "approval"
+    titles = [i.title for i in ProcessOptimizationEngine().analyze(elements, [], step_hits)]
+    assert titles == ["Automation Opportunity"]
+
+
+def test_extract_entities_respects_unicode_word_boundaries():
+    casey = AdvancedCaseyAI()
+    entities = casey._extract_entities("The Müller team asked the café manager and the Ärzte team; managerß too.")
+    assert "manager" in entities["actors"]
+    assert "team" in entities["actors"]
+    assert not {"ller team", "rzte team"} & set(entities["actors"])
+    assert "managerß" not in entities["actors"]
+    assert "caf" not in entities["tools"]
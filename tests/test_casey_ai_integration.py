@@ -0,0 +1,491 @@
+import contextlib
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root / "apps"))
+sys.path.append(str(project_root / "packages"))
+
+from backend.services import casey_ai_integration
+from backend.services.casey_ai_integration import CaseyAIService, TokenBucket
+from backend.services.models import (
+    CreativeProject,
+    ProjectComment,
+    ProjectInsight,
+    ProjectQuestion,
+    ProjectType,
+    TeamMember,
+)
+
+
+@pytest.fixture
+def db_session(sqlite_engine):
+    session = sessionmaker(bind=sqlite_engine)()
+    yield session
+    session.close()
+
+
+def add_project(db_session, name="Landing page", **fields):
+    project = CreativeProject(name=name, project_type=ProjectType.WEBSITE_MOCKUP, **fields)
+    db_session.add(project)
+    db_session.commit()
+    return project
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A service that believes OpenAI is configured; tests replace the LLM call."""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    casey = CaseyAIService()
+    casey.openai_api_key = "test-key"
+    return casey
+
+
+def completion_body(content):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+    }
+
+
+def stream_body(deltas):
+    events = [
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+        }
+        for delta in deltas
+    ]
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+
+
+@pytest.fixture
+def openai_requests(service):
+    """Route the service's OpenAI client to an in-process transport and record the requests."""
+    requests = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body)
+        headers = {"x-ratelimit-remaining-requests": "7"}
+        if body.get("stream"):
+            headers["content-type"] = "text/event-stream"
+            return httpx.Response(200, headers=headers, content=stream_body(["Hel", "lo"]).encode())
+        return httpx.Response(200, headers=headers, json=completion_body("Hello there"))
+
+    service.client = AsyncOpenAI(
+        api_key="test-key",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return requests
+
+
+async def test_call_llm_returns_the_completion_text(service, openai_requests):
+    messages = [{"role": "user", "content": "Hi"}]
+
+    assert await service._call_llm(messages, model="gpt-4o-mini", max_tokens=20) == "Hello there"
+    assert openai_requests[0]["messages"] == messages
+    assert service._rate_limiter.available["requests"] <= 7
+
+
+async def test_only_opted_in_completions_are_cached(service, openai_requests):
+    messages = [{"role": "user", "content": "Hi"}]
+
+    for _ in range(2):
+        await service._call_llm(messages, model="gpt-4o-mini", temperature=0.8)
+    assert len(openai_requests) == 2
+
+    for _ in range(2):
+        await service._call_llm(messages, cache=True, model="gpt-4o-mini", temperature=0.2)
+    assert len(openai_requests) == 3
+    assert "cache" not in openai_requests[-1]
+
+
+async def test_stream_llm_yields_deltas(service, openai_requests):
+    deltas = [
+        delta async for delta in service._stream_llm(
+            [{"role": "user", "content": "Hi"}], model="gpt-4o-mini", max_tokens=20
+        )
+    ]
+
+    assert deltas == ["Hel", "lo"]
+    assert openai_requests[0]["stream"] is True
+
+
+async def test_stream_chat_about_project_streams_the_reply(service, openai_requests):
+    project = CreativeProject(
+        id=1, name="Poster", project_type=ProjectType.WEBSITE_MOCKUP, created_at=datetime(2024, 1, 1)
+    )
+
+    chunks = [chunk async for chunk in service.stream_chat_about_project(project, "Thoughts?", 1, None)]
+
+    assert chunks == ["Hel", "lo"]
+    assert len(openai_requests) == 1
+
+
+async def test_abandoned_stream_closes_the_response_and_frees_its_slot(service):
+    closed = []
+
+    class ChunkStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for delta in ["Hel", "lo"]:
+                yield stream_body([delta]).encode()
+
+        async def aclose(self):
+            closed.append(True)
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=ChunkStream())
+
+    service.client = AsyncOpenAI(
+        api_key="test-key", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    project = CreativeProject(
+        id=1, name="Poster", project_type=ProjectType.WEBSITE_MOCKUP, created_at=datetime(2024, 1, 1)
+    )
+
+    async with contextlib.aclosing(service.stream_chat_about_project(project, "Thoughts?", 1, None)) as chunks:
+        async for chunk in chunks:
+            assert chunk == "Hel"
+            break
+
+    assert closed
+    assert service._llm_semaphore._value == casey_ai_integration.LLM_MAX_CONCURRENT
+
+
+def batch_service(service, batch, files):
+    """Serve one batch and its result files from an in-process transport."""
+
+    def handler(request):
+        if request.url.path.startswith("/v1/batches/"):
+            return httpx.Response(200, json=batch)
+        file_id = request.url.path.split("/")[-2]
+        return httpx.Response(200, content="\n".join(json.dumps(line) for line in files[file_id]).encode())
+
+    service.client = AsyncOpenAI(
+        api_key="test-key", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return service
+
+
+def batch_body(status, **fields):
+    return {
+        "id": "batch_1",
+        "object": "batch",
+        "endpoint": "/v1/chat/completions",
+        "input_file_id": "file_in",
+        "completion_window": "24h",
+        "created_at": 0,
+        "status": status,
+        **fields,
+    }
+
+
+async def test_collect_batch_waits_then_reports_completions_and_failures(service):
+    assert await batch_service(service, batch_body("in_progress"), {}).collect_batch("batch_1") is None
+
+    files = {
+        "file_out": [
+            {"custom_id": "story-1", "response": {"status_code": 200, "body": completion_body("Once upon a time")}},
+            {"custom_id": "story-2", "response": {"status_code": 400, "body": {"error": {"message": "Bad request"}}}},
+        ],
+        "file_err": [
+            {"custom_id": "trends-1", "response": None, "error": {"code": "batch_expired", "message": "Expired"}},
+        ],
+    }
+    batch = batch_body("expired", output_file_id="file_out", error_file_id="file_err")
+    result = await batch_service(service, batch, files).collect_batch("batch_1")
+
+    assert result.status == "expired"
+    assert result.completions == {"story-1": "Once upon a time"}
+    assert [(error["custom_id"], error["error"]["message"]) for error in result.errors] == [
+        ("story-2", "Bad request"),
+        ("trends-1", "Expired"),
+    ]
+
+
+async def test_collect_batch_reports_validation_failures(service):
+    batch = batch_body("failed", errors={"object": "list", "data": [
+        {"code": "invalid_request", "line": 1, "message": "Missing model"}
+    ]})
+    result = await batch_service(service, batch, {}).collect_batch("batch_1")
+
+    assert result.status == "failed"
+    assert result.completions == {}
+    assert result.errors[0]["error"]["message"] == "Missing model"
+
+
+async def test_batch_api_requires_openai_configuration(service):
+    service.openai_api_key = None
+    with pytest.raises(RuntimeError):
+        await service.collect_batch("batch_1")
+    with pytest.raises(RuntimeError):
+        await service.submit_batch([])
+
+
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(requests_per_minute=6000, tokens_per_minute=60000)
+    bucket.available["requests"] = 0
+
+    start = time.monotonic()
+    await bucket.acquire(100)
+
+    assert time.monotonic() - start >= 0.009  # one request refills in 10ms
+    assert bucket.available["tokens"] <= 60000 - 100
+
+
+async def test_token_bucket_clamps_oversized_requests_and_honours_headers():
+    bucket = TokenBucket(requests_per_minute=60, tokens_per_minute=1000)
+    await bucket.acquire(10**9)  # larger than the whole budget, must not hang
+    assert bucket.available["tokens"] < 1
+
+    bucket.update_from_headers({"x-ratelimit-remaining-requests": "3", "x-ratelimit-remaining-tokens": "bad"})
+    assert bucket.available["requests"] <= 3
+
+
+def test_response_cache_expires_and_stays_bounded(service, monkeypatch):
+    service._store_completion("key", "reply")
+    assert service._cached_completion("key") == "reply"
+
+    monkeypatch.setattr(casey_ai_integration, "LLM_CACHE_TTL_SECONDS", 0)
+    assert service._cached_completion("key") is None
+
+    monkeypatch.setattr(casey_ai_integration, "LLM_CACHE_MAX_ENTRIES", 2)
+    for key in ("a", "b", "c"):
+        service._store_completion(key, key)
+    assert list(service._response_cache) == ["b", "c"]
+
+
+async def test_project_context_is_reused_until_the_project_or_its_rows_change(service, db_session):
+    project = add_project(db_session)
+    db_session.add_all([
+        ProjectQuestion(project_id=project.id, question="Audience?", answer="Designers", is_answered=1),
+        ProjectInsight(project_id=project.id, insight_type="color", title="Warm palette", score=0.8),
+        TeamMember(id=1, name="Ann", email="ann@example.com"),
+        ProjectComment(project_id=project.id, author_id=1, content="Looks good"),
+    ])
+    db_session.commit()
+
+    first = await service._gather_project_context(project.id, db_session)
+    assert first["answered_questions"] == {"Audience?": "Designers"}
+    assert first["insights"][0]["title"] == "Warm palette"
+    assert first["team_feedback"][0]["content"] == "Looks good"
+
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    assert await service._gather_project_context(project.id, db_session) is first
+    assert len(statements) == 1  # only the revision query
+
+    project.description = "Updated brief"
+    db_session.commit()
+    refreshed = await service._gather_project_context(project.id, db_session)
+    assert refreshed is not first
+    assert refreshed["project"]["description"] == "Updated brief"
+
+    db_session.add(ProjectComment(project_id=project.id, author_id=1, content="Needs contrast"))
+    db_session.commit()
+    with_comment = await service._gather_project_context(project.id, db_session)
+    assert {c["content"] for c in with_comment["team_feedback"]} == {"Looks good", "Needs contrast"}
+
+    db_session.add(ProjectQuestion(project_id=project.id, question="Deadline?"))
+    db_session.commit()
+    assert await service._gather_project_context(project.id, db_session) is not with_comment
+    question = db_session.query(ProjectQuestion).filter_by(question="Deadline?").one()
+    question.answer, question.is_answered = "Friday", 1
+    db_session.commit()
+    answered = await service._gather_project_context(project.id, db_session)
+    assert answered["answered_questions"]["Deadline?"] == "Friday"
+
+    assert await service._gather_project_context(999, db_session) is None
+
+
+async def test_suggestions_are_shared_by_matching_designs_until_they_expire(service, db_session, monkeypatch):
+    calls = []
+
+    async def fake_call_llm(messages, **kwargs):
+        calls.append(messages)
+        return "- Tighten the grid\n- Raise contrast"
+
+    service._call_llm = fake_call_llm
+    first = add_project(db_session, "One", color_palette=["#fff"])
+    twin = add_project(db_session, "Two", color_palette=["#fff"])
+
+    assert await service.generate_creative_suggestions(first) == ["Tighten the grid", "Raise contrast"]
+    assert await service.generate_creative_suggestions(twin) == ["Tighten the grid", "Raise contrast"]
+    assert len(calls) == 1
+    assert "One" not in calls[0][1]["content"]
+
+    monkeypatch.setattr(casey_ai_integration, "LLM_CACHE_TTL_SECONDS", 0)
+    await service.generate_creative_suggestions(twin)
+    assert len(calls) == 2
+
+
+async def test_bulk_analysis_falls_back_per_project(service, db_session):
+    covered = add_project(db_session, "Covered")
+    missed = add_project(db_session, "Missed")
+    individual = []
+
+    async def fake_call_llm(messages, **kwargs):
+        if kwargs.get("response_format") == {"type": "json_object"}:
+            return json.dumps({"analyses": [{"id": covered.id, "analysis": "Bulk verdict"}]})
+        individual.append(messages)
+        return json.dumps({
+            "summary": "Solo verdict",
+            "key_points": ["Clear layout"],
+            "recommendations": ["Add a footer"],
+            "confidence": 0.9,
+            "next_questions": [],
+        })
+
+    service._call_llm = fake_call_llm
+    results = await service.analyze_projects_bulk([covered.id, missed.id, 999], db_session)
+
+    assert results[covered.id]["summary"] == "Bulk verdict"
+    assert results[missed.id]["summary"] == "Solo verdict"
+    assert results[missed.id]["recommendations"] == ["Add a footer"]
+    assert "Project not found" in results[999]["note"]
+    assert len(individual) == 1
+
+
+def test_key_points_keep_bulleted_and_heading_lines(service):
+    text = "Overview:\n- Strong hierarchy in the hero\nshort - no\n• Palette feels warm and calm\nplain prose line"
+
+    assert service._extract_key_points(text) == [
+        "Strong hierarchy in the hero",
+        "Palette feels warm and calm",
+    ]
+
+
+async def test_analysis_retries_without_structured_output_when_rejected(service):
+    requests = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body)
+        if "response_format" in body:
+            return httpx.Response(400, json={"error": {
+                "message": "response_format json_schema is not supported with this model",
+                "type": "invalid_request_error",
+            }})
+        return httpx.Response(200, json=completion_body("- The layout should use a wider grid"))
+
+    service.client = AsyncOpenAI(
+        api_key="test-key", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    context = service._build_context_from_project(CreativeProject(
+        id=1, name="Poster", project_type=ProjectType.WEBSITE_MOCKUP, created_at=datetime(2024, 1, 1)
+    ))
+
+    first = await service._generate_ai_analysis(context)
+    assert first["summary"] == "- The layout should use a wider grid"
+    assert first["key_points"] == ["The layout should use a wider grid"]
+    assert ["response_format" in body for body in requests] == [True, False]
+
+    context["project"]["description"] = "New brief"
+    await service._generate_ai_analysis(context)
+    assert "response_format" not in requests[-1]
+    assert len(requests) == 3
+
+
+def test_duplicate_log_filter_keys_on_message_and_exception_type():
+    log_filter = casey_ai_integration.DuplicateLogFilter(window_seconds=60)
+
+    def record(exc):
+        try:
+            raise exc
+        except Exception:
+            return logging.LogRecord("casey", logging.ERROR, __file__, 1, "AI chat failed", None, sys.exc_info())
+
+    assert log_filter.filter(record(TimeoutError("first")))
+    assert not log_filter.filter(record(TimeoutError("second")))
+    assert log_filter.filter(record(ValueError("different failure")))
+
+
+async def test_failed_chat_logs_the_traceback_with_context(service, caplog, monkeypatch):
+    for log_filter in casey_ai_integration.logger.filters:
+        monkeypatch.setattr(log_filter, "_last_emitted", {})
+
+    async def failing_call_llm(messages, **kwargs):
+        raise RuntimeError("provider down")
+
+    service._call_llm = failing_call_llm
+    project = CreativeProject(
+        id=7, name="Poster", project_type=ProjectType.WEBSITE_MOCKUP, created_at=datetime(2024, 1, 1)
+    )
+
+    with caplog.at_level(logging.ERROR, logger=casey_ai_integration.logger.name):
+        reply = await service.chat_about_project(project, "Thoughts?", 1, None)
+
+    assert reply
+    [logged] = caplog.records
+    assert logged.method == "chat_about_project" and logged.project_id == 7
+    assert logged.exc_info[0] is RuntimeError
+
+
+async def test_bulk_analysis_splits_projects_by_the_model_output_limit(service, db_session, monkeypatch):
+    monkeypatch.setattr(casey_ai_integration, "DEFAULT_MAX_OUTPUT_TOKENS", 2000)
+    service.models["analysis"] = "unlisted-model"
+    projects = [add_project(db_session, f"Project {i}") for i in range(5)]
+    budgets = []
+
+    async def fake_call_llm(messages, **kwargs):
+        budgets.append(kwargs["max_tokens"])
+        ids = [int(line.split()[3]) for line in messages[1]["content"].splitlines() if line.startswith("=== PROJECT ID")]
+        return json.dumps({"analyses": [{"id": project_id, "analysis": "Verdict"} for project_id in ids]})
+
+    service._call_llm = fake_call_llm
+    results = await service.analyze_projects_bulk([project.id for project in projects], db_session)
+
+    assert sorted(budgets) == [800, 1600, 1600]
+    assert all(results[project.id]["summary"] == "Verdict" for project in projects)
+
+
+def test_prompts_use_stored_enum_values(service):
+    project = CreativeProject(
+        id=1, name="Poster", project_type=ProjectType.WEBSITE_MOCKUP, created_at=datetime(2024, 1, 1)
+    )
+
+    for prompt in (service._build_suggestions_prompt(project, "layout"), service._build_trends_prompt(project)):
+        assert f"this {ProjectType.WEBSITE_MOCKUP.value} project" in prompt
+        assert "ProjectType." not in prompt
+
+
+def test_timeline_counts_rows_without_loading_them(service, db_session):
+    project = add_project(db_session)
+    db_session.add_all([
+        TeamMember(id=1, name="Ann", email="ann@example.com"),
+        ProjectComment(project_id=project.id, author_id=1, content="Looks good"),
+        ProjectComment(project_id=project.id, author_id=1, content="Ship it"),
+        ProjectInsight(project_id=project.id, insight_type="color", title="Warm palette", score=0.8),
+    ])
+    db_session.commit()
+    project_id = project.id
+
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    assert service._count_timeline(db_session, project_id) == (2, 1)
+    assert len(statements) == 2 and all("count(*)" in statement for statement in statements)
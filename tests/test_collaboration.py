@@ -1,11 +1,22 @@
+import json
 import sys
+from datetime import datetime
 from pathlib import Path
 
+import pytest
+from sqlalchemy.orm import sessionmaker
+
 project_root = Path(__file__).resolve().parents[1]
 sys.path.append(str(project_root / "apps"))
 sys.path.append(str(project_root / "packages"))
 
-from backend.services.collaboration import RealTimeCollaboration
+from backend.services.collaboration import CollaborationService, RealTimeCollaboration
+from backend.services.models import (
+    CreativeProject,
+    ProjectActivity,
+    ProjectType,
+    TeamMember,
+)
 
 
 def test_visual_comment_coordinates():
@@ -99,4 +110,145 @@ def test_coordinate_edge_cases():
     # Test with floating point precision
     coords = RealTimeCollaboration.generate_visual_comment_coordinates(33.33, 66.67, 100, 100)
     assert abs(coords["x_percent"] - 33.33) < 0.01
-    assert abs(coords["y_percent"] - 66.67) < 0.01
\ No newline at end of file
+    assert abs(coords["y_percent"] - 66.67) < 0.01
+
+
+def test_annotation_metadata_uses_supplied_timestamp():
+    """Test that a precomputed timestamp is shared across annotations."""
+    stamp = "2024-01-01T00:00:00+00:00"
+    batch = [
+        RealTimeCollaboration.create_annotation_metadata("issue", timestamp=stamp, severity="low")
+        for _ in range(3)
+    ]
+    assert all(metadata["timestamp"] == stamp for metadata in batch)
+
+    metadata = RealTimeCollaboration.create_annotation_metadata("issue")
+    assert metadata["timestamp"].endswith("+00:00")
+
+
+def test_batch_coordinates_match_single_point_helper():
+    """Test that batch coordinates agree with the per-point helper."""
+    xs, ys = [0.0, 100.0, 33.33], [0.0, 200.0, 66.67]
+    batch = RealTimeCollaboration.generate_visual_comment_coordinates_batch(xs, ys, 800, 600)
+
+    for i, (x, y) in enumerate(zip(xs, ys, strict=True)):
+        single = RealTimeCollaboration.generate_visual_comment_coordinates(x, y, 800, 600)
+        assert abs(batch["x_percent"][i] - single["x_percent"]) < 1e-9
+        assert abs(batch["y_percent"][i] - single["y_percent"]) < 1e-9
+    assert batch["image_width"] == 800
+
+    assert batch["x_absolute"] == xs and batch["x_absolute"] is not xs
+    json.dumps(batch)
+
+    empty = RealTimeCollaboration.generate_visual_comment_coordinates_batch(xs, ys, 0, 0)
+    assert empty["x_percent"] == [0.0, 0.0, 0.0]
+
+    with pytest.raises(ValueError):
+        RealTimeCollaboration.generate_visual_comment_coordinates_batch([1.0, 2.0], [2.0], 800, 600)
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    """Sessions on a database holding one project and two team members."""
+    factory = sessionmaker(bind=sqlite_engine)
+    db = factory()
+    db.add_all([
+        CreativeProject(id=1, name="Poster", project_type=ProjectType.WEBSITE_MOCKUP),
+        TeamMember(id=1, name="Ann", email="ann@example.com"),
+        TeamMember(id=2, name="Ben", email="ben@example.com"),
+    ])
+    db.commit()
+    db.close()
+    return factory
+
+
+async def test_comments_are_added_resolved_and_listed(session_factory):
+    service = CollaborationService(session_factory())
+
+    saved = await service.add_comment(1, 1, "Tighten the grid", "design_suggestion", {"priority": "high"})
+    await service.add_comment(1, 2, "Love the palette")
+    assert saved["metadata"] == {"priority": "high"}
+
+    assert await service.resolve_comment(saved["id"], resolved_by=2)
+    assert not await service.resolve_comment(999, resolved_by=2)
+
+    open_comments = await service.get_project_comments(1)
+    assert [c["content"] for c in open_comments] == ["Love the palette"]
+    assert open_comments[0]["author_name"] == "Ben"
+
+    all_comments = {c["id"]: c for c in await service.get_project_comments(1, include_resolved=True)}
+    resolved = all_comments[saved["id"]]
+    assert resolved["is_resolved"] == 1
+    assert resolved["resolved_by_name"] == "Ben"
+    assert resolved["metadata"] == {"priority": "high"}
+
+    activities = await service.get_project_activities(1)
+    assert sorted(a["activity_type"] for a in activities) == ["comment", "comment", "resolve_comment"]
+    assert {"comment_id": saved["id"]} in [a["metadata"] for a in activities]
+    assert await service.get_project_activities(1, activity_types=["resolve_comment"]) == [
+        a for a in activities if a["activity_type"] == "resolve_comment"
+    ]
+
+
+async def test_project_feed_matches_with_and_without_a_session_factory(session_factory):
+    service = CollaborationService(session_factory())
+    await service.add_comment(1, 1, "First pass")
+
+    sequential = await service.get_project_feed(1)
+    concurrent = await CollaborationService(session_factory(), session_factory).get_project_feed(1)
+
+    assert sequential == concurrent
+    assert [c["content"] for c in sequential["comments"]] == ["First pass"]
+    assert [a["activity_type"] for a in sequential["activities"]] == ["comment"]
+
+
+async def test_activity_pages_follow_the_cursor(session_factory):
+    db = session_factory()
+    db.add_all([
+        ProjectActivity(project_id=1, user_id=1, activity_type="upload", created_at=datetime(2024, 1, day))
+        for day in range(1, 6)
+    ])
+    db.commit()
+    service = CollaborationService(db)
+
+    seen = []
+    page = await service.get_project_activity_page(1, limit=2)
+    while True:
+        seen += [activity["created_at"] for activity in page["activities"]]
+        if page["next_cursor"] is None:
+            break
+        cursor = page["next_cursor"]
+        page = await service.get_project_activity_page(
+            1, limit=2,
+            before_created_at=datetime.fromisoformat(cursor["before_created_at"]),
+            before_id=cursor["before_id"],
+        )
+
+    assert seen == [datetime(2024, 1, day).isoformat() for day in range(5, 0, -1)]
+    with pytest.raises(ValueError):
+        await service.get_project_activities(1, before_id=3)
+
+
+async def test_activity_pages_split_rows_that_share_a_timestamp(session_factory):
+    db = session_factory()
+    stamp = datetime(2024, 1, 1, 12, 0)
+    db.add_all([
+        ProjectActivity(project_id=1, user_id=1, activity_type="upload", created_at=stamp)
+        for _ in range(5)
+    ])
+    db.commit()
+    service = CollaborationService(db)
+
+    seen = []
+    cursor = {}
+    while True:
+        page = await service.get_project_activity_page(1, limit=2, **cursor)
+        seen += [activity["id"] for activity in page["activities"]]
+        if page["next_cursor"] is None:
+            break
+        cursor = page["next_cursor"]
+        assert isinstance(cursor["before_created_at"], str)
+
+    assert seen == [5, 4, 3, 2, 1]
+    with pytest.raises(ValueError):
+        await service.get_project_activities(1, before_created_at="yesterday", before_id=3)
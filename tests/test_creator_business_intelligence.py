@@ -354,6 +354,22 @@ async def test_market_intelligence():
     assert "opportunity_gaps" in competition
 
 
+async def test_market_rates_cached_per_skill_set():
+    """Market rates are shared across skill orderings and returned as copies"""
+    market_intel = MarketIntelligence()
+    
+    rates = await market_intel.get_market_rates(["UX Design", "UI Design"])
+    same_rates = await market_intel.get_market_rates(["UI Design", "UX Design"])
+    
+    assert rates == same_rates
+    assert rates["hourly_median"] == 80
+    
+    # Mutating a returned result must not leak into the cache
+    rates["hourly_median"] = 0
+    again = await market_intel.get_market_rates(["UI Design", "UX Design"])
+    assert again["hourly_median"] == 80
+
+
 def test_creator_profile_retrieval():
     """Test creator profile retrieval"""
     db = create_mock_db()